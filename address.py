@@ -1,5 +1,6 @@
 import os
 import hashlib
+from functools import lru_cache
 try:
     from bech32 import bech32_encode, bech32_decode, convertbits
     BECH32_AVAILABLE = True
@@ -16,6 +17,8 @@ except ImportError:
     print("[WARNING] MemoryVault not available, using traditional address generation")
 
 HRP = 'lakha'
+# HRP + separator + 32 five-bit groups (20 bytes) + 6-character checksum
+BECH32_ADDRESS_LENGTH = len(HRP) + 1 + 32 + 6
 
 # Global MemoryVault instance
 _memory_vault = None
@@ -115,7 +118,17 @@ def validate_story_personalness(story: str) -> dict:
 
 def is_valid_address(address):
     """Check if the address is a valid Lahka address."""
+    if not isinstance(address, str):
+        return False
+    return _is_valid_address(address)
+
+@lru_cache(maxsize=4096)
+def _is_valid_address(address):
+    """Validate an address string; cached because the same addresses recur on every request"""
     if BECH32_AVAILABLE:
+        # Anything of the wrong length or prefix cannot pass, so skip the checksum for it
+        if len(address) != BECH32_ADDRESS_LENGTH or address[:len(HRP) + 1].lower() != HRP + '1':
+            return False
         hrp, data = bech32_decode(address)
         if hrp != HRP or data is None:
             return False
@@ -143,6 +156,13 @@ def encode_address(pubkey_bytes):
 
 def decode_address(address):
     """Decode a Lahka address to bytes. Returns None if invalid."""
+    if not isinstance(address, str):
+        return None
+    return _decode_address(address)
+
+@lru_cache(maxsize=1024)
+def _decode_address(address):
+    """Decode an address string; cached like _is_valid_address, and the bytes result is immutable"""
     if BECH32_AVAILABLE:
         hrp, data = bech32_decode(address)
         if hrp != HRP or data is None:
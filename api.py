@@ -5,13 +5,16 @@ Provides RESTful endpoints for blockchain interaction
 """
 
 import json
+import orjson
+import os
 import time
 import logging
 import threading
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from address import generate_address, is_valid_address
-from core import LahkaBlockchain, Transaction, TransactionType
+from core import LahkaBlockchain, Transaction, TransactionType, encode_json
+from network.p2p import install_uvloop
 from typing import Dict, Any, Optional
 import asyncio
 import logging
@@ -23,6 +26,9 @@ logger = logging.getLogger(__name__)
 class LakhaAPI:
     """HTTP API server for Lakha blockchain"""
     
+    MAX_BATCH_SIZE = 50  # Max sub-requests accepted by /api/batch
+    MAX_BLOCKS_PER_ROUND = 10  # Blocks the background miner may produce per wake-up
+    
     def __init__(self, blockchain: LahkaBlockchain, host='0.0.0.0', port=5000):
         self.blockchain = blockchain
         self.host = host
@@ -36,13 +42,15 @@ class LakhaAPI:
         # Register routes
         self._register_routes()
         
+        # Event loop that owns the P2P sockets; broadcasts must be scheduled onto it
+        self.p2p_loop = None
+        
         # Start P2P network if configured
         if self.blockchain.p2p_port:
-            import asyncio
-            import threading
             def run_p2p():
                 loop = asyncio.new_event_loop()
                 asyncio.set_event_loop(loop)
+                self.p2p_loop = loop
                 try:
                     loop.run_until_complete(self.blockchain.start_network())
                     # Wait a bit for P2P connections to establish
@@ -53,8 +61,6 @@ class LakhaAPI:
             
             self.p2p_thread = threading.Thread(target=run_p2p, daemon=True)
             self.p2p_thread.start()
-            # Store the event loop for broadcasting
-            self.p2p_loop = None
             # Wait for P2P network to start (increased from 3 to 8 seconds)
             time.sleep(8)
         
@@ -104,20 +110,17 @@ class LakhaAPI:
                 start = (page - 1) * limit
                 end = start + limit
                 
-                blocks = []
-                for i in range(start, min(end, len(self.blockchain.chain))):
-                    blocks.append(self.blockchain.chain[i].to_dict())
-                
-                return jsonify({
-                    'status': 'success',
-                    'data': {
-                        'blocks': blocks,
-                        'page': page,
-                        'limit': limit,
-                        'total': len(self.blockchain.chain),
-                        'has_more': end < len(self.blockchain.chain)
-                    }
+                # Blocks carry their encoding from when they were added; splice it into the envelope
+                chain = self.blockchain.chain
+                blocks = b','.join(block.to_json() for block in chain[start:end])
+                meta = orjson.dumps({
+                    'page': page,
+                    'limit': limit,
+                    'total': len(chain),
+                    'has_more': end < len(chain)
                 })
+                body = b'{"status":"success","data":{"blocks":[' + blocks + b'],' + meta[1:] + b'}'
+                return self.app.response_class(body, mimetype='application/json')
             except Exception as e:
                 logger.error(f"Error getting blocks: {e}")
                 return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -188,14 +191,16 @@ class LakhaAPI:
         def get_pending_transactions():
             """Get pending transactions"""
             try:
-                pending_txs = [tx.to_dict() for tx in self.blockchain.pending_transactions]
-                return jsonify({
+                # orjson encodes the Transaction dataclasses itself, with the same keys as to_dict()
+                pending = self.blockchain.pending_transactions
+                body = encode_json({
                     'status': 'success',
                     'data': {
-                        'transactions': pending_txs,
-                        'count': len(pending_txs)
+                        'transactions': list(pending),
+                        'count': len(pending)
                     }
                 })
+                return self.app.response_class(body, mimetype='application/json')
             except Exception as e:
                 logger.error(f"Error getting pending transactions: {e}")
                 return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -236,22 +241,7 @@ class LakhaAPI:
                     try:
                         # Check if P2P node has connections
                         if hasattr(self.blockchain.p2p_node, 'connections') and len(self.blockchain.p2p_node.connections) > 0:
-                            # Create a new event loop for broadcasting
-                            import asyncio
-                            import threading
-                            
-                            def broadcast_in_thread():
-                                try:
-                                    loop = asyncio.new_event_loop()
-                                    asyncio.set_event_loop(loop)
-                                    loop.run_until_complete(self.blockchain.broadcast_transaction(tx))
-                                    loop.close()
-                                except Exception as e:
-                                    logger.error(f"Broadcast thread error: {e}")
-                            
-                            # Run broadcast in a separate thread
-                            broadcast_thread = threading.Thread(target=broadcast_in_thread, daemon=True)
-                            broadcast_thread.start()
+                            self._submit_broadcast(self.blockchain.broadcast_transaction(tx), f"transaction {tx.hash}")
                             
                             logger.info(f"Broadcasting transaction {tx.hash} to {len(self.blockchain.p2p_node.connections)} peers")
                         else:
@@ -272,6 +262,80 @@ class LakhaAPI:
                 logger.error(f"Error submitting transaction: {e}")
                 return jsonify({'status': 'error', 'message': str(e)}), 500
         
+        @self.app.route('/api/transactions/batch', methods=['POST'])
+        def submit_transactions_batch():
+            """Submit several transactions in one request"""
+            try:
+                data = request.get_json()
+                if not data or not isinstance(data.get('transactions'), list):
+                    return jsonify({'status': 'error', 'message': 'transactions list is required'}), 400
+                
+                tx_list = data['transactions']
+                if len(tx_list) > self.MAX_BATCH_SIZE:
+                    return jsonify({'status': 'error', 'message': f'Batch exceeds {self.MAX_BATCH_SIZE} transactions'}), 400
+                
+                # Malformed entries are answered here; the rest are admitted together below
+                results = []
+                parsed = []  # (position in results, transaction)
+                required_fields = ['from_address', 'to_address', 'amount', 'transaction_type']
+                for tx_data in tx_list:
+                    missing = [field for field in required_fields if field not in tx_data]
+                    if missing:
+                        results.append({'status': 'error', 'transaction_hash': None, 'message': f'Missing required field: {missing[0]}'})
+                        continue
+                    try:
+                        tx = Transaction(
+                            from_address=tx_data['from_address'],
+                            to_address=tx_data['to_address'],
+                            amount=float(tx_data['amount']),
+                            transaction_type=TransactionType(tx_data['transaction_type']),
+                            data=tx_data.get('data', {}),
+                            gas_limit=int(tx_data.get('gas_limit', 21000)),
+                            gas_price=float(tx_data.get('gas_price', 1.0)),
+                            nonce=int(tx_data.get('nonce', 0))
+                        )
+                    except (TypeError, ValueError) as e:
+                        results.append({'status': 'error', 'transaction_hash': None, 'message': str(e)})
+                        continue
+                    parsed.append((len(results), tx))
+                    results.append(None)
+                
+                # Transactions are validated in order, exactly as individual submissions would be
+                accepted = []
+                admitted = self.blockchain.add_transactions(tx for _, tx in parsed)
+                for (position, tx), success in zip(parsed, admitted):
+                    if success:
+                        accepted.append(tx)
+                        results[position] = {'status': 'success', 'transaction_hash': tx.hash, 'message': 'Transaction submitted successfully'}
+                    else:
+                        results[position] = {'status': 'error', 'transaction_hash': tx.hash, 'message': 'Transaction validation failed'}
+                
+                # Broadcast all accepted transactions to the P2P network in one background pass
+                if accepted and self.blockchain.p2p_node:
+                    if len(self.blockchain.p2p_node.connections) > 0:
+                        async def broadcast_accepted():
+                            # Sequentially, so nonces from one sender arrive in order
+                            for tx in accepted:
+                                await self.blockchain.broadcast_transaction(tx)
+                        
+                        self._submit_broadcast(broadcast_accepted(), f"{len(accepted)} batched transactions")
+                        
+                        logger.info(f"Broadcasting {len(accepted)} batched transactions to {len(self.blockchain.p2p_node.connections)} peers")
+                    else:
+                        logger.warning(f"No P2P connections available for broadcasting {len(accepted)} batched transactions")
+                
+                return jsonify({
+                    'status': 'success',
+                    'data': {
+                        'results': results,
+                        'accepted': len(accepted),
+                        'rejected': len(results) - len(accepted)
+                    }
+                })
+            except Exception as e:
+                logger.error(f"Error submitting transaction batch: {e}")
+                return jsonify({'status': 'error', 'message': str(e)}), 500
+        
         @self.app.route('/api/transactions/<tx_hash>', methods=['GET'])
         def get_transaction(tx_hash):
             """Get transaction by hash"""
@@ -584,22 +648,7 @@ class LakhaAPI:
                         try:
                             # Check if P2P node has connections
                             if hasattr(self.blockchain.p2p_node, 'connections') and len(self.blockchain.p2p_node.connections) > 0:
-                                # Create a new event loop for broadcasting
-                                import asyncio
-                                import threading
-                                
-                                def broadcast_in_thread():
-                                    try:
-                                        loop = asyncio.new_event_loop()
-                                        asyncio.set_event_loop(loop)
-                                        loop.run_until_complete(self.blockchain.broadcast_block(latest_block))
-                                        loop.close()
-                                    except Exception as e:
-                                        logger.error(f"Broadcast thread error: {e}")
-                                
-                                # Run broadcast in a separate thread
-                                broadcast_thread = threading.Thread(target=broadcast_in_thread, daemon=True)
-                                broadcast_thread.start()
+                                self._submit_broadcast(self.blockchain.broadcast_block(latest_block), f"block #{latest_block.index}")
                                 
                                 logger.info(f"Broadcasting block #{latest_block.index} to {len(self.blockchain.p2p_node.connections)} peers")
                             else:
@@ -627,6 +676,43 @@ class LakhaAPI:
                 logger.error(f"Error mining block: {e}")
                 return jsonify({'status': 'error', 'message': str(e)}), 500
         
+        # Batch endpoint
+        @self.app.route('/api/batch', methods=['POST'])
+        def batch_requests():
+            """Execute a pipeline of API sub-requests in a single HTTP round trip"""
+            try:
+                data = request.get_json()
+                if not data or not isinstance(data.get('pipeline'), list):
+                    return jsonify({'status': 'error', 'message': 'pipeline list is required'}), 400
+                
+                pipeline = data['pipeline']
+                if len(pipeline) > self.MAX_BATCH_SIZE:
+                    return jsonify({'status': 'error', 'message': f'Batch exceeds {self.MAX_BATCH_SIZE} requests'}), 400
+                
+                responses = []
+                for sub_request in pipeline:
+                    method = str(sub_request.get('method', 'GET')).upper()
+                    path = sub_request.get('path', '')
+                    if not path.startswith('/api/') or path.startswith('/api/batch'):
+                        responses.append({'status': 400, 'body': {'status': 'error', 'message': f'Invalid batch path: {path}'}})
+                        continue
+                    
+                    # Dispatch through Flask's router so each sub-request runs the normal handler
+                    with self.app.test_request_context(path, method=method, json=sub_request.get('body')):
+                        sub_response = self.app.full_dispatch_request()
+                    responses.append({
+                        'status': sub_response.status_code,
+                        'body': sub_response.get_json(silent=True)
+                    })
+                
+                return jsonify({
+                    'status': 'success',
+                    'data': responses
+                })
+            except Exception as e:
+                logger.error(f"Error processing batch request: {e}")
+                return jsonify({'status': 'error', 'message': str(e)}), 500
+        
         # Utility endpoints
         @self.app.route('/api/utils/generate-address', methods=['POST'])
         def generate_new_address():
@@ -902,22 +988,7 @@ class LakhaAPI:
                     try:
                         # Check if P2P node has connections
                         if hasattr(self.blockchain.p2p_node, 'connections') and len(self.blockchain.p2p_node.connections) > 0:
-                            # Create a new event loop for broadcasting
-                            import asyncio
-                            import threading
-                            
-                            def broadcast_in_thread():
-                                try:
-                                    loop = asyncio.new_event_loop()
-                                    asyncio.set_event_loop(loop)
-                                    loop.run_until_complete(self.blockchain.broadcast_transaction(faucet_tx))
-                                    loop.close()
-                                except Exception as e:
-                                    logger.error(f"Broadcast thread error: {e}")
-                            
-                            # Run broadcast in a separate thread
-                            broadcast_thread = threading.Thread(target=broadcast_in_thread, daemon=True)
-                            broadcast_thread.start()
+                            self._submit_broadcast(self.blockchain.broadcast_transaction(faucet_tx), f"faucet transaction {faucet_tx.hash}")
                             
                             logger.info(f"Broadcasting faucet transaction {faucet_tx.hash} to {len(self.blockchain.p2p_node.connections)} peers")
                         else:
@@ -1012,6 +1083,11 @@ class LakhaAPI:
                             <div class="url">/api/transactions</div>
                             <div class="description">Submit a new transaction</div>
                         </div>
+                        <div class="endpoint">
+                            <div class="method">POST</div>
+                            <div class="url">/api/transactions/batch</div>
+                            <div class="description">Submit several transactions at once ({"transactions": [...]})</div>
+                        </div>
                         <div class="endpoint">
                             <div class="method">GET</div>
                             <div class="url">/api/transactions/{tx_hash}</div>
@@ -1112,6 +1188,11 @@ class LakhaAPI:
                             <div class="url">/api/utils/validate-address</div>
                             <div class="description">Validate a Bech32 address</div>
                         </div>
+                        <div class="endpoint">
+                            <div class="method">POST</div>
+                            <div class="url">/api/batch</div>
+                            <div class="description">Run several API requests in one call ({"pipeline": [{"method", "path", "body"}]})</div>
+                        </div>
                     </div>
                     
                     <div class="section">
@@ -1157,9 +1238,10 @@ class LakhaAPI:
         while self.mining_active:
             try:
                 if self.blockchain.pending_transactions:
-                    success = self.blockchain.mine_block()
-                    if success:
-                        logger.info("Mined a new block")
+                    # Drain a backlog of more than one block's worth in a single wake-up
+                    mined = self.blockchain.mine_blocks(self.MAX_BLOCKS_PER_ROUND)
+                    if mined:
+                        logger.info(f"Mined {mined} new block(s)")
                     else:
                         logger.warning("Failed to mine block")
                 time.sleep(1)  # Wait 1 second between mining attempts
@@ -1167,10 +1249,19 @@ class LakhaAPI:
                 logger.error(f"Error in mining loop: {e}")
                 time.sleep(1)
     
-    def start(self):
-        """Start the Flask API server"""
+    def start(self, ready_fd: Optional[int] = None):
+        """Start the Flask API server, writing READY to ready_fd once it accepts connections"""
         logger.info(f"Starting Lakha API server on {self.host}:{self.port}")
-        self.app.run(host=self.host, port=self.port, debug=False)
+        if ready_fd is None:
+            self.app.run(host=self.host, port=self.port, debug=False)
+            return
+        
+        # Bind first so the listening socket exists before the launcher is told we are up
+        from werkzeug.serving import make_server
+        server = make_server(self.host, self.port, self.app, threaded=True)
+        os.write(ready_fd, b'READY\n')
+        os.close(ready_fd)
+        server.serve_forever()
     
     def _fund_address(self, address: str, amount: float) -> dict:
         """Helper method to fund an address with LAK tokens"""
@@ -1204,20 +1295,7 @@ class LakhaAPI:
             if self.blockchain.p2p_node:
                 try:
                     if hasattr(self.blockchain.p2p_node, 'connections') and len(self.blockchain.p2p_node.connections) > 0:
-                        import asyncio
-                        import threading
-                        
-                        def broadcast_in_thread():
-                            try:
-                                loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(loop)
-                                loop.run_until_complete(self.blockchain.broadcast_transaction(funding_tx))
-                                loop.close()
-                            except Exception as e:
-                                logger.error(f"Broadcast thread error: {e}")
-                        
-                        broadcast_thread = threading.Thread(target=broadcast_in_thread, daemon=True)
-                        broadcast_thread.start()
+                        self._submit_broadcast(self.blockchain.broadcast_transaction(funding_tx), f"funding transaction {funding_tx.hash}")
                         
                         logger.info(f"Broadcasting funding transaction {funding_tx.hash} to {len(self.blockchain.p2p_node.connections)} peers")
                     else:
@@ -1235,6 +1313,21 @@ class LakhaAPI:
             logger.error(f"Error funding address {address}: {e}")
             return {'success': False, 'error': str(e)}
     
+    def _submit_broadcast(self, coro, description: str):
+        """Hand a broadcast coroutine from a Flask thread to the P2P event loop"""
+        loop = self.p2p_loop
+        if loop is None or not loop.is_running():
+            coro.close()
+            logger.warning(f"P2P loop not running, dropped broadcast of {description}")
+            return
+        
+        def report(future):
+            if not future.cancelled() and future.exception():
+                logger.error(f"Broadcast of {description} failed: {future.exception()}")
+        
+        # The only cross-thread hop: code already on the P2P loop should use create_task
+        asyncio.run_coroutine_threadsafe(coro, loop).add_done_callback(report)
+    
     def stop(self):
         """Stop the API server"""
         self.mining_active = False
@@ -1250,9 +1343,13 @@ def main():
     parser.add_argument('--db-path', default='lakha_db', help='Database path')
     parser.add_argument('--p2p-port', type=int, help='P2P port (optional)')
     parser.add_argument('--p2p-peers', nargs='*', help='P2P peer addresses')
+    parser.add_argument('--ready-fd', type=int, help='Inherited file descriptor to write READY to once serving')
     
     args = parser.parse_args()
     
+    if install_uvloop():
+        logger.info("Using uvloop event loop")
+    
     # Create blockchain instance
     blockchain = LahkaBlockchain(
         test_mode=False,
@@ -1272,7 +1369,7 @@ def main():
         print(f"🔗 P2P Peers: {args.p2p_peers}")
     
     try:
-        api.start()
+        api.start(ready_fd=args.ready_fd)
     except KeyboardInterrupt:
         print("\n🛑 Shutting down...")
         api.stop()
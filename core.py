@@ -2,19 +2,49 @@ import hashlib
 import json
 import time
 import uuid
-from typing import Dict, List, Optional, Any, Callable
+from typing import Deque, Dict, Iterable, List, Optional, Set, Any, Callable
 from dataclasses import dataclass, asdict, field
-from collections import defaultdict
+from collections import defaultdict, deque
 import random
+from array import array
+from itertools import islice, repeat
 from datetime import datetime
 from enum import Enum
 # Bech32 address utilities
 from address import generate_address, is_valid_address
+import orjson
 import plyvel
 from network.p2p import Node
 import ast
 
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+def _json_default(obj):
+    """Serialize values orjson has no native encoding for"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def encode_json(obj) -> bytes:
+    """Encode obj with orjson, falling back to the stdlib encoder wherever their output would differ
+
+    orjson rejects ints wider than 64 bits and silently writes inf/nan as null, while the stdlib
+    encoder that to_dict() payloads used to go through accepts the former and writes Infinity/NaN.
+    Any null in orjson's output is therefore re-encoded with the stdlib; real nulls are rare here.
+    """
+    try:
+        encoded = orjson.dumps(obj, default=_json_default, option=ORJSON_OPTIONS)
+    except TypeError:
+        encoded = None
+    if encoded is None or b'null' in encoded:
+        return json.dumps(obj, default=_json_default, separators=(',', ':')).encode()
+    return encoded
+
 class TransactionType(Enum):
+    # The string values are hashed into every transaction and accepted verbatim by the APIs and CLI;
+    # changing them (e.g. to integers) would re-hash stored chains and break existing clients
     TRANSFER = "transfer"
     CONTRACT_DEPLOY = "contract_deploy"
     CONTRACT_CALL = "contract_call"
@@ -158,7 +188,13 @@ class Ledger:
     
     def get_account_history(self, address: str, limit: int = 100) -> List[LedgerEntry]:
         """Get transaction history for an account"""
-        return self.account_history[address][-limit:]
+        # .get() so lookups for unknown addresses don't grow the defaultdict
+        history = self.account_history.get(address)
+        return history[-limit:] if history else []
+    
+    def get_accounts_history(self, addresses: Iterable[str], limit: int = 100) -> Dict[str, List[LedgerEntry]]:
+        """Get transaction history for several accounts, keyed by address"""
+        return {address: self.get_account_history(address, limit) for address in addresses}
     
     def get_balance(self, address: str) -> float:
         """Get current balance for an account"""
@@ -176,7 +212,7 @@ class Ledger:
                 'balance': account.balance,
                 'nonce': account.nonce,
                 'is_contract': account.is_contract,
-                'transaction_count': len(self.account_history[address])
+                'transaction_count': len(self.account_history.get(address, ()))
             }
             for address, account in self.accounts.items()
         }
@@ -285,6 +321,7 @@ class Block:
     state_root: str = ""
     nonce: int = 0
     hash: str = ""
+    _json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         if not self.hash:
@@ -315,6 +352,13 @@ class Block:
             'nonce': self.nonce,
             'hash': self.hash
         }
+    
+    def to_json(self) -> bytes:
+        """JSON encoding of to_dict(), built on first use: a block never changes after it is on the chain"""
+        if self._json is None:
+            # orjson walks the dataclass fields directly; the field order matches to_dict() and _json is skipped
+            self._json = encode_json(self)
+        return self._json
 
 @dataclass
 class Validator:
@@ -627,6 +671,14 @@ class Validator:
 class SmartContractEngine:
     """Generic smart contract execution engine"""
     
+    # Security policies the engine enforces. Contract code is stored, not run, so none of these apply yet
+    FEATURES = {
+        'gas_metering': False,
+        'reentrancy_guard': False,
+        'self_destruct': False,
+        'contract_isolation': False,
+    }
+    
     def __init__(self):
         self.contracts: Dict[str, ContractState] = {}
         self.events: List[ContractEvent] = []
@@ -951,12 +1003,19 @@ class LahkaBlockchain:
     
     def __init__(self, test_mode=False, db_path='lakha_db', p2p_port=None, p2p_peers=None):
         self.chain: List[Block] = []
-        self.pending_transactions: List[Transaction] = []
+        self.pending_transactions: Deque[Transaction] = deque()  # Blocks take from the front
         self.validators: Dict[str, Validator] = {}
         self.storage = LevelDBStorage(db_path=db_path)
         self.ledger = Ledger(storage=self.storage)
         self.contract_engine = SmartContractEngine()
         self.processed_tx_hashes = set()  # Track processed tx hashes for replay protection
+        self.total_tx_count = 0  # Confirmed transactions across the chain
+        # Flat index of confirmed transactions, kept as two parallel arrays: the block holding tx i and its slot there
+        self._tx_block_ids = array('I')
+        self._tx_slots = array('I')
+        self._validators_version = 0  # Bumped by validator updates made outside block processing
+        self._validators_json: Optional[bytes] = None
+        self._validators_json_key = None
         self.test_mode = test_mode  # Enable test mode for deterministic behavior
         # Configuration
         self.minimum_stake = 10.0
@@ -990,7 +1049,7 @@ class LahkaBlockchain:
                 nonce=block_data.get('nonce', 0),
                 hash=block_data.get('hash', '')
             )
-            self.chain.append(block)
+            self._append_block(block)
             i += 1
         # Load accounts from LevelDB
         for key, value in self.storage.db:
@@ -1050,7 +1109,7 @@ class LahkaBlockchain:
             previous_hash="0",
             validator="genesis"
         )
-        self.chain.append(genesis_block)
+        self._append_block(genesis_block)
         # Persist genesis block to LevelDB
         self.storage.put_block(genesis_block)
         # Give initial tokens to genesis address
@@ -1060,8 +1119,47 @@ class LahkaBlockchain:
         """Get the most recent block"""
         return self.chain[-1]
     
+    def _append_block(self, block: Block):
+        """Put a block on the chain and extend the confirmed-transaction index with it"""
+        count = len(block.transactions)
+        self._tx_block_ids.extend(repeat(len(self.chain), count))
+        self._tx_slots.extend(range(count))
+        self.chain.append(block)
+        self.total_tx_count += count
+    
+    def get_transaction_count(self) -> int:
+        """Number of confirmed transactions across the whole chain"""
+        return self.total_tx_count
+    
+    def get_transactions_page(self, start: int, end: int) -> List[Transaction]:
+        """Confirmed transactions start..end in chain order, looked up through the flat index"""
+        if start < 0:
+            return []
+        chain = self.chain
+        return [chain[block_id].transactions[slot]
+                for block_id, slot in zip(self._tx_block_ids[start:end], self._tx_slots[start:end])]
+    
     def add_transaction(self, transaction: Transaction) -> bool:
         """Add a transaction to the pending pool. Enforce Bech32 addresses (except 'genesis' and 'stake_pool')."""
+        return self.add_transactions([transaction])[0]
+    
+    def add_transactions(self, transactions: Iterable[Transaction]) -> List[bool]:
+        """Add several transactions to the pending pool in one pass; returns whether each was accepted"""
+        # Index the pool once for the whole batch instead of rescanning it for every transaction
+        pending_hashes = {tx.hash for tx in self.pending_transactions}
+        pending_nonces = {(tx.from_address, tx.nonce) for tx in self.pending_transactions}
+        results = []
+        for transaction in transactions:
+            accepted = self._admit_transaction(transaction, pending_hashes, pending_nonces)
+            if accepted:
+                pending_hashes.add(transaction.hash)
+                pending_nonces.add((transaction.from_address, transaction.nonce))
+            results.append(accepted)
+        return results
+    
+    def _admit_transaction(self, transaction: Transaction, pending_hashes: Set[str],
+                           pending_nonces: Set[tuple]) -> bool:
+        """Validate one transaction against the chain and the indexed pool, appending it if it passes"""
         # Validate addresses - reject empty addresses
         if not transaction.from_address or (transaction.from_address != 'genesis' and not is_valid_address(transaction.from_address)):
             print(f"[DEBUG] add_transaction: Invalid from_address: {transaction.from_address}")
@@ -1083,10 +1181,9 @@ class LahkaBlockchain:
             print(f"[DEBUG] add_transaction: Duplicate transaction hash: {transaction.hash}")
             return False
         # Check for duplicate hash in pending transactions
-        for pending_tx in self.pending_transactions:
-            if pending_tx.hash == transaction.hash:
-                print(f"[DEBUG] add_transaction: Duplicate hash in pending pool: {transaction.hash}")
-                return False
+        if transaction.hash in pending_hashes:
+            print(f"[DEBUG] add_transaction: Duplicate hash in pending pool: {transaction.hash}")
+            return False
         # Nonce checks
         sender_account = self.ledger.get_account(transaction.from_address)
         if sender_account:
@@ -1107,11 +1204,9 @@ class LahkaBlockchain:
                     print(f"[DEBUG] add_transaction: Nonce mismatch for {transaction.from_address}: expected={expected_nonce}, got={transaction.nonce}")
                     return False
             # Check for duplicate nonce in pending transactions (double-spending prevention)
-            for pending_tx in self.pending_transactions:
-                if (pending_tx.from_address == transaction.from_address and 
-                    pending_tx.nonce == transaction.nonce):
-                    print(f"[DEBUG] add_transaction: Duplicate nonce in pending pool: {transaction.nonce}")
-                    return False
+            if (transaction.from_address, transaction.nonce) in pending_nonces:
+                print(f"[DEBUG] add_transaction: Duplicate nonce in pending pool: {transaction.nonce}")
+                return False
         # Gas/amount checks
         if transaction.gas_limit <= 0 or transaction.gas_price <= 0:
             print(f"[DEBUG] add_transaction: Invalid gas parameters: limit={transaction.gas_limit}, price={transaction.gas_price}")
@@ -1250,15 +1345,41 @@ class LahkaBlockchain:
     
     def register_validator(self, address: str, stake_amount: float) -> bool:
         """Register a new validator. Address must be Bech32 (except 'genesis')."""
-        if not address or (address != 'genesis' and not is_valid_address(address)):
+        if not isinstance(address, str):
             print(f"[DEBUG] Invalid address: {address}")
             return False
+        return self.register_validators({address: stake_amount})[address]
+    
+    def register_validators(self, stakes: Dict[str, float]) -> Dict[str, bool]:
+        """Register several validators, submitting all of their stake transactions as one batch"""
+        results = {address: False for address in stakes}
+        candidates = []
+        for address, stake_amount in stakes.items():
+            stake_tx = self._build_stake_transaction(address, stake_amount)
+            if stake_tx:
+                candidates.append((address, stake_amount, stake_tx))
+        accepted = self.add_transactions([stake_tx for _, _, stake_tx in candidates])
+        for (address, stake_amount, _), success in zip(candidates, accepted):
+            if success:
+                # Add validator immediately to prevent duplicate registration
+                self.validators[address] = Validator(
+                    address=address,
+                    stake=stake_amount
+                )
+            results[address] = success
+        return results
+    
+    def _build_stake_transaction(self, address: str, stake_amount: float) -> Optional[Transaction]:
+        """Check a validator registration and build its stake transaction; None if it cannot register"""
+        if not address or (address != 'genesis' and not is_valid_address(address)):
+            print(f"[DEBUG] Invalid address: {address}")
+            return None
         if address in self.validators:
             print(f"[DEBUG] Duplicate validator registration: {address}")
-            return False
+            return None
         if stake_amount < self.minimum_stake:
             print(f"[DEBUG] Stake amount too low: {stake_amount}")
-            return False
+            return None
         # Check for sufficient balance for stake + gas
         gas_limit = 10
         gas_price = 1.0
@@ -1267,16 +1388,16 @@ class LahkaBlockchain:
         print(f"[DEBUG] Registering validator {address}: balance={current_balance}, required={total_required}")
         if current_balance < total_required:
             print(f"[DEBUG] Insufficient balance for {address}: has {current_balance}, needs {total_required}")
-            return False
+            return None
         
         # Get the correct nonce for the account
         account = self.ledger.get_account(address)
         if not account:
             print(f"[DEBUG] Account not found: {address}")
-            return False
+            return None
         
         # Create stake transaction with correct nonce
-        stake_tx = Transaction(
+        return Transaction(
             from_address=address,
             to_address="stake_pool",
             amount=stake_amount,
@@ -1284,14 +1405,6 @@ class LahkaBlockchain:
             gas_limit=gas_limit,
             nonce=account.nonce  # Use correct nonce
         )
-        success = self.add_transaction(stake_tx)
-        if success:
-            # Add validator immediately to prevent duplicate registration
-            self.validators[address] = Validator(
-                address=address,
-                stake=stake_amount
-            )
-        return success
     
     def select_validator(self) -> Optional[str]:
         """Select a validator using PoCS (Proof of Contribution Stake) scoring"""
@@ -1342,7 +1455,7 @@ class LahkaBlockchain:
     
     def create_block(self, validator_address: str) -> Block:
         """Create a new block with pending transactions"""
-        transactions_to_include = self.pending_transactions[:100]
+        transactions_to_include = list(islice(self.pending_transactions, 100))
         
         # Calculate state root (simplified)
         state_root = self._calculate_state_root()
@@ -1369,10 +1482,8 @@ class LahkaBlockchain:
             except Exception as e:
                 print(f"Transaction processing failed: {e}")
                 continue
-        for transaction in block.transactions:
-            if transaction in self.pending_transactions:
-                self.pending_transactions.remove(transaction)
-        self.chain.append(block)
+        self._remove_pending(block.transactions)
+        self._append_block(block)
         self.ledger.update_balance(block.validator, self.block_reward, "", len(self.chain), "Block reward")
         if block.validator in self.validators:
             validator = self.validators[block.validator]
@@ -1397,6 +1508,21 @@ class LahkaBlockchain:
         self.storage.put_block(block)
         return True
     
+    def _remove_pending(self, transactions: List[Transaction]):
+        """Drop confirmed transactions from the pending pool"""
+        confirmed = {tx.hash for tx in transactions}
+        pending = self.pending_transactions
+        # Locally mined blocks take the oldest transactions, so these are usually at the front
+        removed = 0
+        while pending and pending[0].hash in confirmed:
+            pending.popleft()
+            removed += 1
+        if removed < len(confirmed):
+            # A peer's block may confirm transactions from anywhere in the pool
+            remaining = [tx for tx in pending if tx.hash not in confirmed]
+            pending.clear()
+            pending.extend(remaining)
+    
     def validate_block(self, block: Block) -> bool:
         """Validate a block before adding to chain"""
         if block.index != len(self.chain):
@@ -1424,16 +1550,32 @@ class LahkaBlockchain:
             # Wait for network to settle
             time.sleep(0.5)
         
+        new_block = self.create_block(self._next_block_validator())
+        return self.add_block(new_block)
+    
+    def mine_blocks(self, n: int) -> int:
+        """Mine up to n blocks back to back, stopping early once the pool is empty; returns the number mined"""
+        if not self.pending_transactions:
+            return 0
+        
+        # Settle once for the whole run rather than before every block
+        if self.p2p_node and len(self.p2p_node.connections) > 0:
+            time.sleep(0.5)
+        
+        mined = 0
+        while mined < n and self.pending_transactions:
+            if not self.add_block(self.create_block(self._next_block_validator())):
+                break
+            mined += 1
+        return mined
+    
+    def _next_block_validator(self) -> str:
+        """Validator for the next block, falling back to genesis"""
         # For the first block after genesis, use genesis validator
         if len(self.chain) == 1 and not self.validators:
-            validator = "genesis"
-        else:
-            validator = self.select_validator()
-            # If no validators yet, allow genesis to mine any transaction type
-            if not validator:
-                validator = "genesis"
-        new_block = self.create_block(validator)
-        return self.add_block(new_block)
+            return "genesis"
+        # If no validators yet, allow genesis to mine any transaction type
+        return self.select_validator() or "genesis"
     
     def mine_block_with_validator(self, validator_address: str) -> bool:
         """Mine a block with a specific validator (for testing)"""
@@ -1485,6 +1627,7 @@ class LahkaBlockchain:
                 
                 # Update reputation scores
                 self.validators[reviewee].update_reputation_score()
+        self._validators_version += 1
     
     def trigger_peer_reviews(self):
         """Trigger a round of peer reviews"""
@@ -1511,6 +1654,7 @@ class LahkaBlockchain:
         """Apply penalty to a validator"""
         if validator_address in self.validators:
             self.validators[validator_address].apply_penalty(penalty_type, severity, reason)
+            self._validators_version += 1
     
     def community_override_penalty(self, validator_address: str, new_penalty_multiplier: float, reason: str = ""):
         """Community governance override of algorithmic penalty"""
@@ -1526,6 +1670,7 @@ class LahkaBlockchain:
                 old_multiplier - new_penalty_multiplier, 
                 f"Community override: {reason}"
             ))
+            self._validators_version += 1
     
     def get_contribution_mining_activities(self) -> dict:
         """Get available contribution mining activities"""
@@ -1619,16 +1764,19 @@ class LahkaBlockchain:
         
         for validator in self.validators.values():
             validator.adjust_dynamic_weight(condition, factor)
+        self._validators_version += 1
     
     def record_collaboration(self, validator_address: str, activity: str, score: float):
         """Record cross-validator collaboration activity"""
         if validator_address in self.validators:
             self.validators[validator_address].update_collaboration_score(activity, score)
+            self._validators_version += 1
     
     def record_network_health_contribution(self, validator_address: str, metric: str, contribution: float):
         """Record network health contribution"""
         if validator_address in self.validators:
             self.validators[validator_address].update_network_health_contribution(metric, contribution)
+            self._validators_version += 1
     
     def get_network_performance_summary(self) -> dict:
         """Get comprehensive network performance summary"""
@@ -1677,6 +1825,15 @@ class LahkaBlockchain:
             'collaboration_score': avg_scores['collaboration']
         }
     
+    def get_validators_json(self) -> bytes:
+        """JSON object of every validator's to_dict(), re-encoded only after validator state changes"""
+        # Blocks and registrations change the chain length or validator count; other updates bump the version
+        key = (len(self.chain), len(self.validators), self._validators_version)
+        if self._validators_json_key != key:
+            self._validators_json = orjson.dumps({addr: val.to_dict() for addr, val in self.validators.items()})
+            self._validators_json_key = key
+        return self._validators_json
+    
     def get_balance(self, address: str) -> float:
         """Get balance for an address"""
         return self.ledger.get_balance(address)
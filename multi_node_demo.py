@@ -4,21 +4,53 @@ Multi-Node Lakha Blockchain Demo
 Demonstrates running multiple nodes, validator registration, and cross-node transactions
 """
 
-import subprocess
+import asyncio
 import time
-import json
-import requests
+import logging
+import aiohttp
+import orjson
 import os
 import signal
 import sys
+import threading
+from collections import deque
 from typing import Dict, List, Optional
+from network.p2p import install_uvloop
+
+# Run nodes inside this interpreter instead of spawning `python api.py` per node
+IN_PROCESS = os.environ.get('LAKHA_DEMO_IN_PROCESS') == '1'
+# Print per-step chain heads and funding fallbacks
+DEBUG = os.environ.get('LAKHA_DEMO_DEBUG') == '1'
+
+logger = logging.getLogger(__name__)
 
 class MultiNodeDemo:
-    def __init__(self, num_nodes=2):
+    def __init__(self, num_nodes=2, in_process=IN_PROCESS):
         self.num_nodes = num_nodes
+        self.in_process = in_process
         self.nodes = {}
         self.validator_wallets = {}
         self.processes = []
+        self.session = None
+        self._nonce_cache: Dict[str, int] = {}  # Next nonce to use per sender address
+        self._watch_tasks: List[asyncio.Task] = []
+        self._write_tasks: set = set()  # Wallet files still being written
+        self.block_event = asyncio.Event()  # Set when any node announces a block
+        
+    async def start(self):
+        """Open the shared HTTP session used for all node API calls"""
+        # One keep-alive pool for every node: sockets to each API port are
+        # reused across calls instead of reconnecting per request
+        connector = aiohttp.TCPConnector(
+            limit=max(64, self.num_nodes * 32),
+            limit_per_host=32,
+            keepalive_timeout=60,
+            ttl_dns_cache=300
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'Connection': 'keep-alive'}
+        )
         
     def get_api_port(self, i):
         return 5000 + 2 * i
@@ -29,10 +61,54 @@ class MultiNodeDemo:
     def get_db_path(self, i):
         return f'lakha_db_node{i+1}'
     
-    def start_node(self, node_id: str, api_port: int, p2p_port: int, db_path: str, peers: Optional[List[str]] = None):
+    async def start_node(self, node_id: str, api_port: int, p2p_port: int, db_path: str, peers: Optional[List[str]] = None):
         """Start a Lakha blockchain node"""
         print(f"🚀 Starting Node {node_id} on API port {api_port}, P2P port {p2p_port}")
         
+        self.nodes[node_id] = {
+            'api_port': api_port,
+            'p2p_port': p2p_port,
+            'db_path': db_path,
+            'process': None,
+            'api_url': f'http://localhost:{api_port}'
+        }
+        
+        if self.in_process:
+            # LakhaAPI blocks while its P2P thread starts, so build it off the event loop
+            try:
+                self.nodes[node_id]['local'] = await asyncio.to_thread(
+                    self._start_local_node, api_port, p2p_port, db_path, peers
+                )
+            except Exception as e:
+                print(f"❌ Node {node_id} failed to start: {e}")
+                return False
+            process = None
+        else:
+            process = await self._spawn_node(node_id, api_port, p2p_port, db_path, peers)
+            self.nodes[node_id]['process'] = process
+        
+        return await self._wait_until_healthy(node_id, process)
+    
+    def _start_local_node(self, api_port: int, p2p_port: int, db_path: str, peers: Optional[List[str]]) -> Dict:
+        """Create a blockchain + API server in this process and serve it from a thread"""
+        from werkzeug.serving import make_server
+        from core import LahkaBlockchain
+        from api import LakhaAPI
+        
+        blockchain = LahkaBlockchain(
+            test_mode=False,
+            db_path=db_path,
+            p2p_port=p2p_port,
+            p2p_peers=peers or None
+        )
+        api = LakhaAPI(blockchain, port=api_port)
+        server = make_server(api.host, api_port, api.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return {'blockchain': blockchain, 'api': api, 'server': server}
+    
+    async def _spawn_node(self, node_id: str, api_port: int, p2p_port: int, db_path: str,
+                          peers: Optional[List[str]]) -> asyncio.subprocess.Process:
+        """Start a node as a separate `python api.py` process"""
         cmd = [
             'python', 'api.py',
             '--port', str(api_port),
@@ -43,59 +119,98 @@ class MultiNodeDemo:
         if peers:
             cmd.extend(['--p2p-peers'] + peers)
         
-        # Start the process
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
+        # Start the process with stderr folded into stdout; the pipe must be
+        # drained continuously or the child blocks once the OS buffer fills
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT
         )
-        
-        self.nodes[node_id] = {
-            'api_port': api_port,
-            'p2p_port': p2p_port,
-            'db_path': db_path,
-            'process': process,
-            'api_url': f'http://localhost:{api_port}'
-        }
-        
-        # Wait for node to start
-        time.sleep(5)
-        
-        # Check if node is running
-        try:
-            response = requests.get(f'http://localhost:{api_port}/api/health', timeout=5)
-            if response.status_code == 200:
-                print(f"✅ Node {node_id} started successfully")
+        output = deque(maxlen=200)
+        self.nodes[node_id]['output'] = output
+        self.nodes[node_id]['drain_task'] = asyncio.create_task(self._drain(process.stdout, output))
+        return process
+    
+    async def _drain(self, stream: asyncio.StreamReader, output: deque):
+        """Read a node's output until EOF, keeping the most recent lines"""
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            output.append(line.decode(errors='replace').rstrip())
+    
+    async def _wait_until_healthy(self, node_id: str, process: Optional[asyncio.subprocess.Process]) -> bool:
+        """Poll a node's health endpoint until it answers or the deadline passes"""
+        api_port = self.nodes[node_id]['api_port']
+        deadline = time.monotonic() + 30
+        backoff = 0.1
+        last_error = None
+        while time.monotonic() < deadline:
+            # Bail out early if the process died during startup
+            if process is not None and process.returncode is not None:
+                last_error = f"process exited with code {process.returncode}"
+                break
+            try:
+                async with self.session.get(f'http://localhost:{api_port}/api/health',
+                                            timeout=aiohttp.ClientTimeout(total=1)) as response:
+                    if response.status == 200:
+                        print(f"✅ Node {node_id} started successfully")
+                        return True
+                    last_error = f"HTTP {response.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = e
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 1.5, 0.5)
+        
+        print(f"❌ Node {node_id} failed to start: {last_error or 'timed out'}")
+        for line in list(self.nodes[node_id].get('output', ()))[-20:]:
+            print(f"   {line}")
+        return False
+    
+    async def wait_for_p2p(self, timeout: float = 15.0) -> bool:
+        """Wait until every node reports at least one P2P connection"""
+        deadline = time.monotonic() + timeout
+        backoff = 0.1
+        while time.monotonic() < deadline:
+            counts = await asyncio.gather(*(self._p2p_connections(node_id) for node_id in self.nodes))
+            if all(count >= 1 for count in counts):
                 return True
-            else:
-                print(f"❌ Node {node_id} failed to start (HTTP {response.status_code})")
-                return False
-        except Exception as e:
-            print(f"❌ Node {node_id} failed to start: {e}")
-            return False
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 1.5, 0.5)
+        return False
     
-    def create_validator_wallet(self, node_id: str, story: str) -> Optional[Dict]:
+    async def _p2p_connections(self, node_id: str) -> int:
+        """Return the number of P2P connections a node reports (0 if unreachable)"""
+        try:
+            async with self.session.get(f'{self.nodes[node_id]["api_url"]}/api/p2p/status',
+                                        timeout=aiohttp.ClientTimeout(total=1)) as response:
+                if response.status == 200:
+                    return (await response.json())['data'].get('connections', 0)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        return 0
+    
+    async def create_validator_wallet(self, node_id: str, story: str) -> Optional[Dict]:
         """Create a validator wallet on a specific node"""
         print(f"\n🎭 Creating validator wallet on Node {node_id}")
         
         api_url = self.nodes[node_id]['api_url']
         
         # Create funded wallet
-        response = requests.post(
+        async with self.session.post(
             f'{api_url}/api/memoryvault/create-funded-wallet',
             json={
                 'story': story,
                 'funding_amount': 1000.0
             },
-            timeout=10
-        )
-        
-        if response.status_code != 200:
-            print(f"❌ Failed to create wallet on Node {node_id}: {response.text}")
-            return None
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as response:
+            if response.status != 200:
+                print(f"❌ Failed to create wallet on Node {node_id}: {await response.text()}")
+                return None
+            
+            result = await response.json()
         
-        result = response.json()
         if result['status'] != 'success':
             print(f"❌ Wallet creation failed on Node {node_id}: {result['message']}")
             return None
@@ -124,8 +239,10 @@ class MultiNodeDemo:
             'api_url': api_url
         }
         
-        with open(filename, 'w') as f:
-            json.dump(wallet_info, f, indent=2)
+        # Write the file off the event loop; cleanup waits for any still in flight
+        task = asyncio.create_task(asyncio.to_thread(self._write_json, filename, wallet_info))
+        self._write_tasks.add(task)
+        task.add_done_callback(self._write_tasks.discard)
         
         self.validator_wallets[node_id] = {
             'filename': filename,
@@ -134,7 +251,13 @@ class MultiNodeDemo:
         
         return wallet_data
     
-    def register_validator(self, node_id: str, stake_amount: float = 100.0) -> bool:
+    @staticmethod
+    def _write_json(filename: str, data: Dict):
+        """Write data to a pretty-printed JSON file in a single write"""
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    
+    async def register_validator(self, node_id: str, stake_amount: float = 100.0) -> bool:
         """Register a validator on a specific node"""
         print(f"\n⚡ Registering validator on Node {node_id}")
         
@@ -144,15 +267,6 @@ class MultiNodeDemo:
         
         wallet_data = self.validator_wallets[node_id]['data']
         address = wallet_data['address']
-        api_url = wallet_data['api_url']
-        
-        # Get nonce
-        response = requests.get(f'{api_url}/api/accounts/{address}/nonce', timeout=5)
-        if response.status_code != 200:
-            print(f"❌ Failed to get nonce for {address}")
-            return False
-        
-        nonce = response.json()['data']['nonce']
         
         # Create stake transaction (simplified - in real implementation would need proper signing)
         stake_tx = {
@@ -161,16 +275,13 @@ class MultiNodeDemo:
             'amount': stake_amount,
             'transaction_type': 'stake',
             'gas_limit': 10,
-            'gas_price': 1.0,
-            'nonce': nonce
+            'gas_price': 1.0
         }
         
-        response = requests.post(f'{api_url}/api/transactions', json=stake_tx, timeout=10)
-        if response.status_code != 200:
-            print(f"❌ Failed to submit stake transaction: {response.text}")
+        results = await self.submit_txs(node_id, [stake_tx])
+        if results is None:
             return False
-        
-        result = response.json()
+        result = results[0]
         if result['status'] != 'success':
             print(f"❌ Stake transaction failed: {result['message']}")
             return False
@@ -178,22 +289,90 @@ class MultiNodeDemo:
         print(f"✅ Validator registered on Node {node_id}")
         print(f"   Address: {address}")
         print(f"   Stake: {stake_amount} LAK")
-        print(f"   Transaction: {result['data']['transaction_hash']}")
+        print(f"   Transaction: {result['transaction_hash']}")
         
         return True
     
-    def mine_block(self, node_id: str) -> bool:
+    async def _get_nonce(self, api_url: str, address: str) -> Optional[int]:
+        """Fetch the current account nonce for an address"""
+        async with self.session.get(f'{api_url}/api/accounts/{address}/nonce',
+                                    timeout=aiohttp.ClientTimeout(total=5)) as response:
+            if response.status != 200:
+                print(f"❌ Failed to get nonce for {address}")
+                return None
+            return (await response.json())['data']['nonce']
+    
+    async def submit_txs(self, node_id: str, txs: List[Dict]) -> Optional[List[Dict]]:
+        """Submit transactions to a node in one batch call, assigning nonces client-side"""
+        submitted = await self._submit_batch(node_id, txs)
+        if submitted is None:
+            return None
+        results, from_cache = submitted
+        
+        # A rejected tx may have used a stale cached nonce: refetch and retry those once
+        retry = [i for i, result in enumerate(results) if result['status'] != 'success' and from_cache[i]]
+        if retry:
+            retried = await self._submit_batch(node_id, [txs[i] for i in retry])
+            if retried is not None:
+                for i, result in zip(retry, retried[0]):
+                    results[i] = result
+        return results
+    
+    async def _submit_batch(self, node_id: str, txs: List[Dict]):
+        """Post one batch; returns (results, whether each tx's nonce came from the cache)"""
+        api_url = self.nodes[node_id]['api_url']
+        
+        # Only senders without a cached nonce need a lookup
+        senders = list(dict.fromkeys(tx['from_address'] for tx in txs))
+        missing = [sender for sender in senders if sender not in self._nonce_cache]
+        nonces = await asyncio.gather(*(self._get_nonce(api_url, sender) for sender in missing))
+        if any(nonce is None for nonce in nonces):
+            return None
+        next_nonce = {sender: self._nonce_cache.get(sender) for sender in senders}
+        next_nonce.update(zip(missing, nonces))
+        from_cache = []
+        for tx in txs:
+            tx['nonce'] = next_nonce[tx['from_address']]
+            next_nonce[tx['from_address']] += 1
+            from_cache.append(tx['from_address'] not in missing)
+        
+        async with self.session.post(f'{api_url}/api/transactions/batch', json={'transactions': txs},
+                                     timeout=aiohttp.ClientTimeout(total=10)) as response:
+            if response.status != 200:
+                print(f"❌ Failed to submit transactions: {await response.text()}")
+                for sender in senders:
+                    self._nonce_cache.pop(sender, None)
+                return None
+            
+            result = await response.json()
+        
+        if result['status'] != 'success':
+            print(f"❌ Transaction batch failed: {result['message']}")
+            return None
+        
+        results = result['data']['results']
+        # Accepted txs advance the cached nonce; a rejection invalidates the sender's entry
+        for tx, tx_result in zip(txs, results):
+            if tx_result['status'] == 'success':
+                self._nonce_cache[tx['from_address']] = tx['nonce'] + 1
+            else:
+                self._nonce_cache.pop(tx['from_address'], None)
+        return results, from_cache
+    
+    async def mine_block(self, node_id: str) -> bool:
         """Mine a block on a specific node"""
         print(f"\n⛏️ Mining block on Node {node_id}")
         
         api_url = self.nodes[node_id]['api_url']
         
-        response = requests.post(f'{api_url}/api/mining/mine', timeout=10)
-        if response.status_code != 200:
-            print(f"❌ Failed to mine block on Node {node_id}: {response.text}")
-            return False
+        async with self.session.post(f'{api_url}/api/mining/mine',
+                                     timeout=aiohttp.ClientTimeout(total=10)) as response:
+            if response.status != 200:
+                print(f"❌ Failed to mine block on Node {node_id}: {await response.text()}")
+                return False
+            
+            result = await response.json()
         
-        result = response.json()
         if result['status'] != 'success':
             print(f"❌ Mining failed on Node {node_id}: {result['message']}")
             return False
@@ -206,40 +385,41 @@ class MultiNodeDemo:
         
         return True
     
-    def get_status(self, node_id: str) -> Optional[Dict]:
+    async def get_status(self, node_id: str) -> Optional[Dict]:
         """Get status of a specific node"""
         api_url = self.nodes[node_id]['api_url']
         
         try:
-            response = requests.get(f'{api_url}/api/status', timeout=5)
-            if response.status_code == 200:
-                return response.json()['data']
-            else:
-                return None
+            async with self.session.get(f'{api_url}/api/status',
+                                        timeout=aiohttp.ClientTimeout(total=5)) as response:
+                if response.status == 200:
+                    return (await response.json())['data']
+                else:
+                    return None
         except Exception as e:
             print(f"❌ Failed to get status for Node {node_id}: {e}")
             return None
     
-    def create_user_wallet(self, node_id: str, story: str) -> Optional[Dict]:
+    async def create_user_wallet(self, node_id: str, story: str) -> Optional[Dict]:
         """Create a user wallet on a specific node"""
         print(f"\n👤 Creating user wallet on Node {node_id}")
         
         api_url = self.nodes[node_id]['api_url']
         
-        response = requests.post(
+        async with self.session.post(
             f'{api_url}/api/memoryvault/create-funded-wallet',
             json={
                 'story': story,
                 'funding_amount': 0.000001  # 1 IBE
             },
-            timeout=10
-        )
-        
-        if response.status_code != 200:
-            print(f"❌ Failed to create user wallet on Node {node_id}: {response.text}")
-            return None
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as response:
+            if response.status != 200:
+                print(f"❌ Failed to create user wallet on Node {node_id}: {await response.text()}")
+                return None
+            
+            result = await response.json()
         
-        result = response.json()
         if result['status'] != 'success':
             print(f"❌ User wallet creation failed on Node {node_id}: {result['message']}")
             # Show validation details if available
@@ -264,7 +444,7 @@ class MultiNodeDemo:
         
         return wallet_data
     
-    def send_transaction(self, from_node: str, to_node: str, amount: float) -> bool:
+    async def send_transaction(self, from_node: str, to_node: str, amount: float) -> bool:
         """Send a transaction between nodes"""
         print(f"\n💸 Sending {amount} LAK from Node {from_node} to Node {to_node}")
         
@@ -275,15 +455,6 @@ class MultiNodeDemo:
         
         from_address = self.validator_wallets[from_node]['data']['address']
         to_address = self.validator_wallets[to_node]['data']['address']
-        api_url = self.nodes[from_node]['api_url']
-        
-        # Get nonce
-        response = requests.get(f'{api_url}/api/accounts/{from_address}/nonce', timeout=5)
-        if response.status_code != 200:
-            print(f"❌ Failed to get nonce for {from_address}")
-            return False
-        
-        nonce = response.json()['data']['nonce']
         
         # Create transfer transaction
         tx = {
@@ -292,16 +463,13 @@ class MultiNodeDemo:
             'amount': amount,
             'transaction_type': 'transfer',
             'gas_limit': 100,
-            'gas_price': 1.0,
-            'nonce': nonce
+            'gas_price': 1.0
         }
         
-        response = requests.post(f'{api_url}/api/transactions', json=tx, timeout=10)
-        if response.status_code != 200:
-            print(f"❌ Failed to submit transaction: {response.text}")
+        results = await self.submit_txs(from_node, [tx])
+        if results is None:
             return False
-        
-        result = response.json()
+        result = results[0]
         if result['status'] != 'success':
             print(f"❌ Transaction failed: {result['message']}")
             return False
@@ -310,17 +478,54 @@ class MultiNodeDemo:
         print(f"   From: {from_address}")
         print(f"   To: {to_address}")
         print(f"   Amount: {amount} LAK")
-        print(f"   Hash: {result['data']['transaction_hash']}")
+        print(f"   Hash: {result['transaction_hash']}")
         
         return True
     
-    def show_network_status(self):
+    async def _status_one(self, node_id: str):
+        """Fetch chain and P2P status for a single node in one batched call"""
+        pipeline = {'pipeline': [
+            {'method': 'GET', 'path': '/api/status'},
+            {'method': 'GET', 'path': '/api/p2p/status'}
+        ]}
+        try:
+            async with self.session.post(f'{self.nodes[node_id]["api_url"]}/api/batch', json=pipeline,
+                                         timeout=aiohttp.ClientTimeout(total=5)) as response:
+                if response.status != 200:
+                    return None, None
+                status_resp, p2p_resp = (await response.json())['data']
+        except Exception as e:
+            print(f"❌ Failed to get status for Node {node_id}: {e}")
+            return None, None
+        
+        if status_resp['status'] != 200:
+            return None, None
+        status = status_resp['body']['data']
+        
+        # Check P2P status
+        if p2p_resp['status'] == 200:
+            p2p_data = p2p_resp['body']['data']
+        else:
+            p2p_data = None
+        return status, p2p_data
+    
+    async def log_chain_head(self, node_id: str):
+        """Log a node's height and head hash; skips the status call unless debugging"""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        status = await self.get_status(node_id)
+        if status:
+            logger.debug("%s chain height: %d hash: %.12s...",
+                         node_id, status['chain_length'], status['latest_block']['hash'])
+    
+    async def show_network_status(self):
         """Show status of all nodes"""
+        results = await asyncio.gather(*(self._status_one(node_id) for node_id in self.nodes))
+        
         print(f"\n🌐 Network Status")
         print("=" * 50)
         
-        for node_id, node_info in self.nodes.items():
-            status = self.get_status(node_id)
+        for (node_id, node_info), (status, p2p_data) in zip(self.nodes.items(), results):
             if status:
                 print(f"Node {node_id}:")
                 print(f"  API: http://localhost:{node_info['api_port']}")
@@ -329,39 +534,90 @@ class MultiNodeDemo:
                 print(f"  Pending TXs: {status['pending_transactions']}")
                 print(f"  Validators: {status['validators']}")
                 
-                # Check P2P status
-                try:
-                    p2p_response = requests.get(f'{node_info["api_url"]}/api/p2p/status', timeout=5)
-                    if p2p_response.status_code == 200:
-                        p2p_data = p2p_response.json()['data']
-                        print(f"  P2P Connections: {p2p_data.get('connections', 0)}")
-                        print(f"  P2P Enabled: {p2p_data.get('enabled', False)}")
-                except:
+                if p2p_data is None:
                     print(f"  P2P Status: ❌ Unavailable")
+                elif p2p_data:
+                    print(f"  P2P Connections: {p2p_data.get('connections', 0)}")
+                    print(f"  P2P Enabled: {p2p_data.get('enabled', False)}")
                 print()
             else:
                 print(f"Node {node_id}: ❌ Offline")
                 print()
     
-    def cleanup(self):
+    def watch_blocks(self):
+        """Listen on every node's P2P socket and set block_event when a block is announced"""
+        for node_id, node_info in self.nodes.items():
+            self._watch_tasks.append(asyncio.create_task(self._watch_node(node_id, node_info['p2p_port'])))
+    
+    async def _watch_node(self, node_id: str, p2p_port: int):
+        """Follow one node's broadcasts as an observer, which the node does not count as a peer"""
+        try:
+            async with self.session.ws_connect(f'http://localhost:{p2p_port}/ws?role=observer', heartbeat=30) as ws:
+                async for msg in ws:
+                    if msg.type not in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                        continue
+                    # Malformed or non-object frames are skipped so they cannot end the watcher
+                    try:
+                        message = orjson.loads(msg.data)
+                    except orjson.JSONDecodeError:
+                        continue
+                    if isinstance(message, dict) and message.get('type') == 'block':
+                        self.block_event.set()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"⚠️  Stopped watching {node_id} for blocks: {e}")
+    
+    async def wait_for_blocks(self, stop: asyncio.Event, fallback: float = 60.0):
+        """Reprint network status when a block arrives, polling only as a fallback"""
+        while not stop.is_set():
+            waiters = [asyncio.create_task(self.block_event.wait()), asyncio.create_task(stop.wait())]
+            await asyncio.wait(waiters, timeout=fallback, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in waiters:
+                waiter.cancel()
+            if stop.is_set():
+                break
+            # A block fans out to every node; let it settle before printing once
+            await asyncio.sleep(0.5)
+            self.block_event.clear()
+            await self.show_network_status()
+    
+    async def cleanup(self):
         """Clean up all processes"""
         print("\n🧹 Cleaning up...")
         
+        for task in self._watch_tasks:
+            task.cancel()
+        if self._write_tasks:
+            await asyncio.gather(*self._write_tasks, return_exceptions=True)
+        
         for node_id, node_info in self.nodes.items():
-            if node_info['process']:
+            process = node_info['process']
+            if process:
                 print(f"Stopping Node {node_id}...")
-                node_info['process'].terminate()
-                try:
-                    node_info['process'].wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    node_info['process'].kill()
+                if process.returncode is None:
+                    process.terminate()
+                    try:
+                        await asyncio.wait_for(process.wait(), timeout=5)
+                    except asyncio.TimeoutError:
+                        process.kill()
+                        await process.wait()
+                node_info['drain_task'].cancel()
+            elif 'local' in node_info:
+                print(f"Stopping Node {node_id}...")
+                local = node_info['local']
+                await asyncio.to_thread(local['server'].shutdown)
+                local['api'].stop()
+                local['blockchain'].close()
+        
+        if self.session:
+            await self.session.close()
         
         print("✅ Cleanup complete")
 
-def main():
+async def main_async():
     """Main demo function"""
     num_nodes = 2  # Change this to add more nodes
     demo = MultiNodeDemo(num_nodes=num_nodes)
+    await demo.start()
 
     try:
         print("🚀 Lakha Multi-Node Blockchain Demo")
@@ -371,23 +627,27 @@ def main():
         print("\n📋 Step 1: Starting Nodes")
         print("-" * 30)
 
-        for i in range(num_nodes):
-            node_id = f'node{i+1}'
-            api_port = demo.get_api_port(i)
-            p2p_port = demo.get_p2p_port(i)
-            db_path = demo.get_db_path(i)
+        def start(i):
             peers = []
             if i > 0:
                 # Connect all new nodes to node1's P2P port
                 peers = [f'ws://localhost:{demo.get_p2p_port(0)}']
-            if not demo.start_node(node_id, api_port, p2p_port, db_path, peers):
-                print(f"❌ Failed to start {node_id}")
+            return demo.start_node(f'node{i+1}', demo.get_api_port(i), demo.get_p2p_port(i),
+                                   demo.get_db_path(i), peers)
+
+        # node1 must be listening before the others dial it; the rest start together
+        started = [await start(0)]
+        started += await asyncio.gather(*(start(i) for i in range(1, num_nodes)))
+        for i, ok in enumerate(started):
+            if not ok:
+                print(f"❌ Failed to start node{i+1}")
                 return
 
         # Wait for P2P connections to establish
         print("\n⏳ Waiting for P2P connections to establish...")
-        time.sleep(15)
-        demo.show_network_status()
+        if num_nodes > 1 and not await demo.wait_for_p2p():
+            print("⚠️  P2P connections not established yet, continuing anyway")
+        await demo.show_network_status()
 
         # Step 2: Create validator wallets and mine after each
         print("\n📋 Step 2: Creating Validator Wallets")
@@ -400,34 +660,35 @@ def main():
         for i in range(num_nodes):
             node_id = f'node{i+1}'
             story = validator_stories[i % len(validator_stories)]
-            wallet = demo.create_validator_wallet(node_id, story)
+            wallet = await demo.create_validator_wallet(node_id, story)
             if not wallet:
                 print(f"❌ Failed to create validator wallet for {node_id}")
                 return
             # Mine a block to process funding
-            demo.mine_block(node_id)
-            # Print chain status after mining
-            status = demo.get_status(node_id)
-            if status:
-                print(f"   [DEBUG] {node_id} chain height: {status['chain_length']} hash: {status['latest_block']['hash'][:12]}...")
+            await demo.mine_block(node_id)
+            await demo.log_chain_head(node_id)
             # If node1, wait longer for propagation before next node
             if i == 0 and num_nodes > 1:
-                print("   [DEBUG] Waiting for block propagation to other nodes...")
-                time.sleep(8)
+                logger.debug("Waiting for block propagation to other nodes...")
+                await asyncio.sleep(8)
             else:
-                time.sleep(2)
+                await asyncio.sleep(2)
 
-        # Step 3: Register validators and mine after each
+        # Step 3: Register validators, then mine once per node
         print("\n📋 Step 3: Registering Validators")
         print("-" * 30)
-        for i in range(num_nodes):
-            node_id = f'node{i+1}'
-            stake_amount = 100.0 + 50.0 * i
-            if not demo.register_validator(node_id, stake_amount):
-                print(f"❌ Failed to register validator on {node_id}")
+        # Stake transactions come from each node's own validator address, so
+        # they share no nonce and can be submitted concurrently
+        registered = await asyncio.gather(*(
+            demo.register_validator(f'node{i+1}', 100.0 + 50.0 * i) for i in range(num_nodes)
+        ))
+        for i, ok in enumerate(registered):
+            if not ok:
+                print(f"❌ Failed to register validator on node{i+1}")
                 return
-            demo.mine_block(node_id)
-            time.sleep(2)
+        for i in range(num_nodes):
+            await demo.mine_block(f'node{i+1}')
+        await asyncio.sleep(2)
 
         # Step 4: Create user wallets and mine after each
         print("\n📋 Step 4: Creating User Wallets")
@@ -440,26 +701,24 @@ def main():
         for i in range(num_nodes):
             node_id = f'node{i+1}'
             story = user_stories[i % len(user_stories)]
-            user_wallet = demo.create_user_wallet(node_id, story)
+            user_wallet = await demo.create_user_wallet(node_id, story)
             # If funding failed on node2, try faucet as fallback
             if user_wallet and not user_wallet.get('funding', {}).get('funded') and node_id == 'node2':
-                print(f"   [DEBUG] Funding failed on {node_id}, trying faucet endpoint...")
+                logger.debug("Funding failed on %s, trying faucet endpoint...", node_id)
                 api_url = demo.nodes[node_id]['api_url']
                 address = user_wallet['address']
                 try:
-                    faucet_resp = requests.post(f'{api_url}/api/faucet', json={'address': address, 'amount': 0.000001}, timeout=10)
-                    if faucet_resp.status_code == 200:
-                        print(f"   [DEBUG] Faucet funding succeeded for {address}")
-                    else:
-                        print(f"   [DEBUG] Faucet funding failed: {faucet_resp.text}")
+                    async with demo.session.post(f'{api_url}/api/faucet', json={'address': address, 'amount': 0.000001},
+                                                 timeout=aiohttp.ClientTimeout(total=10)) as faucet_resp:
+                        if faucet_resp.status == 200:
+                            logger.debug("Faucet funding succeeded for %s", address)
+                        else:
+                            logger.debug("Faucet funding failed: %s", await faucet_resp.text())
                 except Exception as e:
-                    print(f"   [DEBUG] Faucet funding exception: {e}")
-            demo.mine_block(node_id)
-            # Print chain status after mining
-            status = demo.get_status(node_id)
-            if status:
-                print(f"   [DEBUG] {node_id} chain height: {status['chain_length']} hash: {status['latest_block']['hash'][:12]}...")
-            time.sleep(2)
+                    logger.debug("Faucet funding exception: %s", e)
+            await demo.mine_block(node_id)
+            await demo.log_chain_head(node_id)
+            await asyncio.sleep(2)
 
         # Step 5: Cross-node transactions (node1 -> node2, node2 -> node3, ...)
         print("\n📋 Step 5: Cross-Node Transactions")
@@ -467,25 +726,20 @@ def main():
         for i in range(num_nodes - 1):
             from_node = f'node{i+1}'
             to_node = f'node{i+2}'
-            if demo.send_transaction(from_node, to_node, 50.0):
+            if await demo.send_transaction(from_node, to_node, 50.0):
                 print(f"✅ Cross-node transaction from {from_node} to {to_node} submitted")
-                demo.mine_block(from_node)
-                # Print chain status after mining
-                status_from = demo.get_status(from_node)
-                if status_from:
-                    print(f"   [DEBUG] {from_node} chain height: {status_from['chain_length']} hash: {status_from['latest_block']['hash'][:12]}...")
-                print("   [DEBUG] Waiting for transaction/block propagation to other nodes...")
-                time.sleep(8)
-                demo.mine_block(to_node)
-                status_to = demo.get_status(to_node)
-                if status_to:
-                    print(f"   [DEBUG] {to_node} chain height: {status_to['chain_length']} hash: {status_to['latest_block']['hash'][:12]}...")
-                time.sleep(2)
+                await demo.mine_block(from_node)
+                await demo.log_chain_head(from_node)
+                logger.debug("Waiting for transaction/block propagation to other nodes...")
+                await asyncio.sleep(8)
+                await demo.mine_block(to_node)
+                await demo.log_chain_head(to_node)
+                await asyncio.sleep(2)
 
         # Step 6: Show final network status
         print("\n📋 Step 6: Final Network Status")
         print("-" * 30)
-        demo.show_network_status()
+        await demo.show_network_status()
 
         print("\n🎉 Multi-Node Demo Complete!")
         print("=" * 50)
@@ -498,17 +752,35 @@ def main():
             print(f"   Node {i+1}: http://localhost:{demo.get_api_port(i)}")
         print("\n⏹️  Press Ctrl+C to stop the demo")
 
-        # Keep running until interrupted
-        while True:
-            time.sleep(10)
-            demo.show_network_status()
-
-    except KeyboardInterrupt:
+        # Keep running until interrupted, reprinting status whenever a block is mined
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:
+                pass  # Windows: Ctrl+C still raises KeyboardInterrupt
+        demo.watch_blocks()
+        await demo.wait_for_blocks(stop)
         print("\n\n🛑 Demo interrupted by user")
+
     except Exception as e:
         print(f"\n❌ Demo failed: {e}")
     finally:
-        demo.cleanup()
+        await demo.cleanup()
+
+def main():
+    """Run the demo on a single event loop"""
+    if DEBUG:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('   [DEBUG] %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+    install_uvloop()
+    try:
+        asyncio.run(main_async())
+    except KeyboardInterrupt:
+        print("\n\n🛑 Demo interrupted by user")
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Node health probes
+Checks /api/health on several local nodes concurrently, plus helpers the node scripts share
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+import time
+import aiohttp
+import orjson
+from typing import Dict, Iterable, List, Optional, Union
+
+HEALTH_TIMEOUT = 2.0        # Seconds to wait for each node's /api/health
+RTT_FILE = 'peer_rtt.json'  # Last measured probe RTT in milliseconds, keyed by peer URL
+
+async def probe(session: aiohttp.ClientSession, port: int, timeout: float = HEALTH_TIMEOUT,
+                rtts: Optional[Dict[int, float]] = None) -> int:
+    """Return the HTTP status of one node's health endpoint, recording the RTT in rtts if given"""
+    start = time.perf_counter()
+    async with session.get(f'http://localhost:{port}/api/health',
+                           timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        if rtts is not None:
+            rtts[port] = (time.perf_counter() - start) * 1000
+        return response.status
+
+async def probe_all(ports: Iterable[int], timeout: float = HEALTH_TIMEOUT,
+                    rtts: Optional[Dict[int, float]] = None) -> List[Union[int, BaseException]]:
+    """Probe every port at once; each result is a status code or the exception raised"""
+    async with aiohttp.ClientSession() as session:
+        return await asyncio.gather(*(probe(session, port, timeout, rtts) for port in ports),
+                                    return_exceptions=True)
+
+def check_nodes(ports: Iterable[int], timeout: float = HEALTH_TIMEOUT,
+                rtts: Optional[Dict[int, float]] = None) -> List[Union[int, BaseException]]:
+    """Blocking wrapper around probe_all for synchronous scripts"""
+    return asyncio.run(probe_all(ports, timeout, rtts))
+
+def load_rtts(path: str = RTT_FILE) -> Dict[str, float]:
+    """Read recorded peer RTTs; empty if nothing has been recorded yet"""
+    try:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return {}
+
+def save_rtts(rtts: Dict[str, float], path: str = RTT_FILE):
+    """Merge measured peer RTTs into the RTT file, replacing it atomically"""
+    merged = load_rtts(path)
+    merged.update(rtts)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(merged, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+    os.replace(tmp_path, path)
+
+def sort_by_rtt(peers: Iterable[str], rtts: Dict[str, float]) -> List[str]:
+    """Order peers fastest first; peers without a measurement keep their order at the end"""
+    return sorted(peers, key=lambda peer: rtts.get(peer, float('inf')))
+
+async def wait_ready(ports: Iterable[int], timeout: float = 30.0, interval: float = 0.2) -> bool:
+    """Poll until every port reports healthy; False if the deadline passes first"""
+    ports = list(ports)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(result == 200 for result in await probe_all(ports)):
+            return True
+        await asyncio.sleep(interval)
+    return False
+
+def fast_rmtree(path):
+    """Delete a directory tree, letting `rm -rf` do it in C where available"""
+    rm = shutil.which('rm') if os.name != 'nt' else None
+    if rm:
+        subprocess.run([rm, '-rf', '--', path], check=True)
+    else:
+        shutil.rmtree(path)
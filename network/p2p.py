@@ -1,22 +1,44 @@
-print("LOADED NODE CLASS FROM:", __file__)
 import asyncio
+import logging
 from aiohttp import web, ClientSession, WSMsgType
-import json
+import orjson
 from typing import List, Dict, Callable, Optional
 
+logger = logging.getLogger(__name__)
+
+def install_uvloop() -> bool:
+    """Make uvloop the default event loop if it is installed; returns whether it was"""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    # A policy rather than a single loop, so threads calling new_event_loop() get uvloop too
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
 class Node:
+    RECONNECT_BASE_DELAY = 0.5   # Seconds before the first reconnect attempt
+    RECONNECT_MAX_DELAY = 30.0   # Cap for the exponential reconnect backoff
+    MAX_CONCURRENT_SENDS = 32    # Broadcast writes allowed in flight at once
+
     def __init__(self, host: str = 'localhost', port: int = 8765, peers: Optional[List[str]] = None):
         self.host = host
         self.port = port
         self.peers = set(peers) if peers else set()
         self.server = None
-        self.connections = set()
+        # Live websockets keyed by peer id (peer URL for outbound, remote:id for inbound)
+        self.connections: Dict[str, web.WebSocketResponse] = {}
+        # Passive subscribers (/ws?role=observer): they receive broadcasts but are not counted as peers
+        self.observers: Dict[str, web.WebSocketResponse] = {}
         self.handlers: Dict[str, Callable] = {}
         self.running = False
         self.app = web.Application()
         self.app.add_routes([web.get('/ws', self.handle_connection)])
         self.runner = None
         self.site = None
+        self.client_session: Optional[ClientSession] = None
+        self._reconnect_tasks = set()
+        self._send_sem = asyncio.Semaphore(self.MAX_CONCURRENT_SENDS)
 
     async def start(self):
         self.runner = web.AppRunner(self.app)
@@ -24,88 +46,120 @@ class Node:
         self.site = web.TCPSite(self.runner, self.host, self.port)
         await self.site.start()
         self.running = True
-        print(f"[P2P] Node started on {self.host}:{self.port}")
+        self.client_session = ClientSession()
+        logger.info("[P2P] Node started on %s:%s", self.host, self.port)
         await self.connect_to_peers()
 
     async def connect_to_peers(self):
         for peer in list(self.peers):
-            try:
-                session = ClientSession()
-                ws = await session.ws_connect(peer.replace('ws://', 'http://') + '/ws')
-                self.connections.add(ws)
-                asyncio.create_task(self.listen(ws))
-                print(f"[P2P] Connected to peer {peer}")
-            except Exception as e:
-                print(f"[P2P] Failed to connect to {peer}: {e}")
+            if not await self._connect_peer(peer):
+                self._schedule_reconnect(peer)
+
+    async def _connect_peer(self, peer: str) -> bool:
+        try:
+            ws = await self.client_session.ws_connect(peer.replace('ws://', 'http://') + '/ws', heartbeat=30)
+        except Exception as e:
+            logger.warning("[P2P] Failed to connect to %s: %s", peer, e)
+            return False
+        self.connections[peer] = ws
+        asyncio.create_task(self.listen(peer, ws))
+        logger.info("[P2P] Connected to peer %s", peer)
+        return True
+
+    def _schedule_reconnect(self, peer: str):
+        task = asyncio.create_task(self._reconnect_peer(peer))
+        self._reconnect_tasks.add(task)
+        task.add_done_callback(self._reconnect_tasks.discard)
+
+    async def _reconnect_peer(self, peer: str):
+        """Retry a configured peer with exponential backoff until it connects or the node stops"""
+        delay = self.RECONNECT_BASE_DELAY
+        while self.running and peer not in self.connections:
+            await asyncio.sleep(delay)
+            if not self.running or await self._connect_peer(peer):
+                return
+            delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
 
     async def handle_connection(self, request):
         ws = web.WebSocketResponse()
         await ws.prepare(request)
-        self.connections.add(ws)
-        print(f"[P2P] Incoming connection from {request.remote}")
+        key = f"{request.remote}:{id(ws)}"
+        registry = self.observers if request.query.get('role') == 'observer' else self.connections
+        registry[key] = ws
+        logger.info("[P2P] Incoming %s from %s",
+                    "observer" if registry is self.observers else "connection", request.remote)
         try:
-            async for msg in ws:
-                if msg.type == WSMsgType.TEXT:
-                    await self.handle_message(msg.data, ws)
-                elif msg.type == WSMsgType.ERROR:
-                    print(f"[P2P] WS connection closed with exception {ws.exception()}")
+            await self._read_loop(ws)
         finally:
-            self.connections.discard(ws)
+            registry.pop(key, None)
         return ws
 
-    async def listen(self, ws):
+    async def _read_loop(self, ws):
+        """Dispatch every frame received on a websocket until it closes"""
+        async for msg in ws:
+            if msg.type in (WSMsgType.TEXT, WSMsgType.BINARY):
+                await self.handle_message(msg.data, ws)
+            elif msg.type == WSMsgType.ERROR:
+                logger.warning("[P2P] WS connection closed with exception %s", ws.exception())
+                break
+
+    async def listen(self, key: str, ws):
         try:
-            async for msg in ws:
-                if msg.type == WSMsgType.TEXT:
-                    await self.handle_message(msg.data, ws)
-                elif msg.type == WSMsgType.ERROR:
-                    print(f"[P2P] WS connection closed with exception {ws.exception()}")
+            await self._read_loop(ws)
         except Exception as e:
-            print(f"[P2P] Connection closed: {e}")
+            logger.info("[P2P] Connection closed: %s", e)
         finally:
-            self.connections.discard(ws)
+            # Only drop the entry if it still refers to this socket
+            if self.connections.get(key) is ws:
+                del self.connections[key]
+            # Outbound links to configured peers are re-established
+            if self.running and key in self.peers and key not in self.connections:
+                self._schedule_reconnect(key)
 
     async def handle_message(self, message, websocket):
         try:
-            print(f"[P2P] Received message: {message[:100]}...")
-            data = json.loads(message)
+            data = orjson.loads(message)
             msg_type = data.get('type')
             payload = data.get('payload')
-            print(f"[P2P] Message type: {msg_type}, payload keys: {list(payload.keys()) if payload else 'None'}")
+            # Only build the expensive debug arguments when someone is listening
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[P2P] Received %s message, payload keys: %s",
+                             msg_type, list(payload.keys()) if payload else None)
             
             handler = self.handlers.get(msg_type)
             if handler:
-                print(f"[P2P] Calling handler for message type: {msg_type}")
                 await handler(payload, websocket)
-                print(f"[P2P] Handler completed for message type: {msg_type}")
             else:
-                print(f"[P2P] Unknown message type: {msg_type}")
-                print(f"[P2P] Available handlers: {list(self.handlers.keys())}")
-        except Exception as e:
-            print(f"[P2P] Error handling message: {e}")
-            import traceback
-            traceback.print_exc()
+                logger.warning("[P2P] Unknown message type: %s", msg_type)
+        except Exception:
+            logger.exception("[P2P] Error handling message")
 
     def on(self, msg_type: str, handler: Callable):
         self.handlers[msg_type] = handler
-        print(f"[P2P] Registered handler for message type: {msg_type}")
-        print(f"[P2P] Total handlers registered: {len(self.handlers)}")
+        logger.debug("[P2P] Registered handler for message type: %s", msg_type)
 
-    async def broadcast(self, msg_type: str, payload):
-        message = json.dumps({'type': msg_type, 'payload': payload})
-        print(f"[P2P] Broadcasting {msg_type} message to {len(self.connections)} peers")
-        print(f"[P2P] Message content: {message[:100]}...")
-        
-        sent_count = 0
-        for ws in list(self.connections):
+    async def _send_one(self, key: str, ws, message: bytes) -> bool:
+        async with self._send_sem:
             try:
-                await ws.send_str(message)
-                sent_count += 1
-                print(f"[P2P] Successfully sent {msg_type} message to peer")
+                await ws.send_bytes(message)
+                return True
             except Exception as e:
-                print(f"[P2P] Failed to send to peer: {e}")
+                logger.warning("[P2P] Failed to send to peer %s: %s", key, e)
+                for registry in (self.connections, self.observers):
+                    if registry.get(key) is ws:
+                        del registry[key]
+                return False
+
+    async def broadcast(self, msg_type: str, payload):
+        # Encode once; orjson returns UTF-8 bytes so peers share one buffer
+        message = orjson.dumps({'type': msg_type, 'payload': payload}, option=orjson.OPT_NON_STR_KEYS)
+        targets = tuple(self.connections.items()) + tuple(self.observers.items())
+        logger.debug("[P2P] Broadcasting %s message to %d peers", msg_type, len(targets))
+        
+        # Send to peers concurrently, at most MAX_CONCURRENT_SENDS writes in flight
+        results = await asyncio.gather(*(self._send_one(key, ws, message) for key, ws in targets))
         
-        print(f"[P2P] Broadcast completed: {sent_count}/{len(self.connections)} messages sent")
+        logger.debug("[P2P] Broadcast completed: %d/%d messages sent", sum(results), len(targets))
 
     async def stop(self):
         self.running = False
@@ -113,7 +167,13 @@ class Node:
             await self.site.stop()
         if self.runner:
             await self.runner.cleanup()
-        for ws in list(self.connections):
+        for task in list(self._reconnect_tasks):
+            task.cancel()
+        for ws in list(self.connections.values()) + list(self.observers.values()):
             await ws.close()
         self.connections.clear()
-        print(f"[P2P] Node stopped.") 
\ No newline at end of file
+        self.observers.clear()
+        if self.client_session:
+            await self.client_session.close()
+            self.client_session = None
+        logger.info("[P2P] Node stopped.") 
\ No newline at end of file
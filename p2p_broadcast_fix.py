@@ -6,75 +6,93 @@ Shows the current issue and provides a simple fix
 
 import asyncio
 import json
+import orjson
 import time
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Any
+from network.health import check_nodes
+
+# One keep-alive connection pool shared by every call in this script
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=16,
+                                     max_retries=Retry(total=2, backoff_factor=0.1)))
+
+# Local test network, built once: adding a node is a one-line change to PORTS
+PORTS = (5000, 5001, 5002)
+NODES = tuple((f'Node {i}', f'http://localhost:{port}') for i, port in enumerate(PORTS, 1))
+PENDING_URLS = tuple(f'{url}/api/transactions/pending' for _, url in NODES)
+
+async def fetch_pending(urls):
+    """GET several pending-pool URLs at once; each result is (status, raw body) or the exception raised"""
+    async def fetch(session, url):
+        async with session.get(url) as response:
+            return response.status, await response.read()
+    
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
+        return await asyncio.gather(*(fetch(session, url) for url in urls), return_exceptions=True)
+
+def check_node(name, port, check):
+    """Print a node's heading and run its check, reporting any failure the same way"""
+    print(f"\n📡 Testing {name} (Port {port}):")
+    try:
+        check()
+    except Exception as e:
+        print(f"   ❌ Error: {e!r}")
+
+def submit_faucet_transaction(url):
+    """Generate an address on a node, fund it from the faucet and show the node's pending pool"""
+    response = SESSION.post(f'{url}/api/utils/generate-address')
+    if response.status_code != 200:
+        print(f"   ❌ Address generation failed: {response.text}")
+        return
+    address = response.json()['data']['address']
+    print(f"   Generated address: {address}")
+    
+    # Submit faucet transaction and read the pending pool in one round trip;
+    # the node runs batch sub-requests in order
+    batch_response = SESSION.post(f'{url}/api/batch', json={'pipeline': [
+        {'method': 'POST', 'path': '/api/faucet', 'body': {'address': address, 'amount': 50.0}},
+        {'method': 'GET', 'path': '/api/transactions/pending'}
+    ]})
+    faucet_result, pending_result = batch_response.json()['data']
+    if faucet_result['status'] != 200:
+        print(f"   ❌ Faucet failed: {faucet_result['body']}")
+        return
+    print(f"   ✅ Faucet transaction submitted")
+    if pending_result['status'] == 200:
+        print(f"   📊 Pending transactions: {pending_result['body']['data']['count']}")
+
+def report_received(result, source):
+    """Show whether a peer's pending pool (a fetch_pending result) holds anything from source"""
+    if isinstance(result, BaseException):
+        raise result
+    status, body = result
+    if status != 200:
+        print(f"   ❌ Failed to get pending transactions: {body.decode(errors='replace')}")
+        return
+    pending_count = orjson.loads(body)['data']['count']
+    print(f"   📊 Pending transactions: {pending_count}")
+    if pending_count == 0:
+        print(f"   ❌ No transactions received from {source} (broadcasting failed)")
+    else:
+        print(f"   ✅ Transactions received from {source}")
 
 def test_current_broadcasting():
     """Test the current broadcasting behavior"""
     print("🔍 Testing Current P2P Broadcasting")
     print("=" * 45)
     
-    # Test Node 1
-    print("\n1️⃣ Testing Node 1 (Port 5000):")
-    try:
-        # Generate address
-        response = requests.post('http://localhost:5000/api/utils/generate-address')
-        if response.status_code == 200:
-            address = response.json()['data']['address']
-            print(f"   Generated address: {address}")
-            
-            # Submit faucet transaction
-            faucet_response = requests.post('http://localhost:5000/api/faucet', 
-                                          json={'address': address, 'amount': 50.0})
-            if faucet_response.status_code == 200:
-                print(f"   ✅ Faucet transaction submitted")
-                
-                # Check pending transactions
-                pending_response = requests.get('http://localhost:5000/api/transactions/pending')
-                if pending_response.status_code == 200:
-                    pending_count = pending_response.json()['data']['count']
-                    print(f"   📊 Pending transactions: {pending_count}")
-            else:
-                print(f"   ❌ Faucet failed: {faucet_response.text}")
-        else:
-            print(f"   ❌ Address generation failed: {response.text}")
-    except Exception as e:
-        print(f"   ❌ Error: {e}")
+    # Submit a transaction on the first node...
+    source, source_url = NODES[0]
+    check_node(source, PORTS[0], lambda: submit_faucet_transaction(source_url))
     
-    # Test Node 2
-    print("\n2️⃣ Testing Node 2 (Port 5001):")
-    try:
-        # Check pending transactions
-        pending_response = requests.get('http://localhost:5001/api/transactions/pending')
-        if pending_response.status_code == 200:
-            pending_count = pending_response.json()['data']['count']
-            print(f"   📊 Pending transactions: {pending_count}")
-            if pending_count == 0:
-                print("   ❌ No transactions received from Node 1 (broadcasting failed)")
-            else:
-                print("   ✅ Transactions received from Node 1")
-        else:
-            print(f"   ❌ Failed to get pending transactions: {pending_response.text}")
-    except Exception as e:
-        print(f"   ❌ Error: {e}")
-    
-    # Test Node 3
-    print("\n3️⃣ Testing Node 3 (Port 5002):")
-    try:
-        # Check pending transactions
-        pending_response = requests.get('http://localhost:5002/api/transactions/pending')
-        if pending_response.status_code == 200:
-            pending_count = pending_response.json()['data']['count']
-            print(f"   📊 Pending transactions: {pending_count}")
-            if pending_count == 0:
-                print("   ❌ No transactions received from Node 1 (broadcasting failed)")
-            else:
-                print("   ✅ Transactions received from Node 1")
-        else:
-            print(f"   ❌ Failed to get pending transactions: {pending_response.text}")
-    except Exception as e:
-        print(f"   ❌ Error: {e}")
+    # ...then ask every other node for it at once
+    results = asyncio.run(fetch_pending(PENDING_URLS[1:]))
+    for (name, _), port, result in zip(NODES[1:], PORTS[1:], results):
+        check_node(name, port, lambda: report_received(result, source))
 
 def demonstrate_broadcasting_issue():
     """Demonstrate the specific broadcasting issue"""
@@ -114,7 +132,15 @@ def suggest_simple_fixes():
     print("   • Add delays for P2P network startup")
     
     print("\n2️⃣ CODE CHANGES NEEDED:")
-    print("   • Fix async event loop handling in api.py")
+    print("   • Fix async event loop handling in api.py:")
+    print("     broadcast on the loop that owns the peer sockets, never a new one")
+    print("       if asyncio.get_running_loop() is p2p_loop:   # already on the P2P loop")
+    print("           p2p_loop.create_task(node.broadcast(...))")
+    print("       else:                                        # Flask thread -> P2P loop")
+    print("           asyncio.run_coroutine_threadsafe(node.broadcast(...), p2p_loop)")
+    print("     (get_running_loop() raises RuntimeError in a plain thread: treat that as the else branch)")
+    print("   • On Python 3.12+, loop.set_task_factory(asyncio.eager_task_factory) lets")
+    print("     broadcasts that never suspend finish inline without a scheduler round trip")
     print("   • Add proper error handling in core.py broadcast methods")
     print("   • Improve message serialization in p2p.py")
     print("   • Add connection status monitoring")
@@ -124,90 +150,19 @@ def suggest_simple_fixes():
     print("   • Add connection status endpoints")
     print("   • Add broadcast success/failure metrics")
     print("   • Add automated multi-node testing")
-
-def create_broadcast_test():
-    """Create a simple test to verify broadcasting"""
-    print("\n🧪 Creating Broadcast Test")
-    print("=" * 30)
-    
-    test_code = '''
-#!/usr/bin/env python3
-"""
-Simple Broadcast Test
-Tests P2P broadcasting functionality
-"""
-
-import requests
-import time
-import json
-
-def test_broadcast():
-    """Test broadcasting between nodes"""
-    print("Testing P2P Broadcasting...")
-    
-    # Step 1: Generate address on Node 1
-    print("1. Generating address on Node 1...")
-    response = requests.post('http://localhost:5000/api/utils/generate-address')
-    if response.status_code != 200:
-        print("❌ Failed to generate address")
-        return
-    
-    address = response.json()['data']['address']
-    print(f"   Address: {address}")
-    
-    # Step 2: Submit transaction on Node 1
-    print("2. Submitting transaction on Node 1...")
-    tx_data = {
-        'from_address': 'genesis',
-        'to_address': address,
-        'amount': 100.0,
-        'transaction_type': 'transfer',
-        'gas_limit': 21000,
-        'gas_price': 1.0
-    }
-    
-    response = requests.post('http://localhost:5000/api/transactions', json=tx_data)
-    if response.status_code != 200:
-        print("❌ Failed to submit transaction")
-        return
     
-    tx_hash = response.json()['data']['transaction_hash']
-    print(f"   Transaction hash: {tx_hash[:16]}...")
-    
-    # Step 3: Wait for broadcast
-    print("3. Waiting for broadcast...")
-    time.sleep(3)
-    
-    # Step 4: Check all nodes for the transaction
-    print("4. Checking all nodes for transaction...")
-    nodes = [
-        ('Node 1', 'http://localhost:5000'),
-        ('Node 2', 'http://localhost:5001'),
-        ('Node 3', 'http://localhost:5002')
-    ]
-    
-    for node_name, url in nodes:
-        try:
-            response = requests.get(f'{url}/api/transactions/pending')
-            if response.status_code == 200:
-                pending_txs = response.json()['data']['transactions']
-                found = any(tx['hash'] == tx_hash for tx in pending_txs)
-                status = "✅ Found" if found else "❌ Not found"
-                print(f"   {node_name}: {status} ({len(pending_txs)} pending)")
-            else:
-                print(f"   {node_name}: ❌ Error - {response.status_code}")
-        except Exception as e:
-            print(f"   {node_name}: ❌ Exception - {e}")
-
-if __name__ == '__main__':
-    test_broadcast()
-'''
-    
-    with open('broadcast_test.py', 'w') as f:
-        f.write(test_code)
-    
-    print("✅ Created broadcast_test.py")
-    print("Run with: python broadcast_test.py")
+    print("\n4️⃣ SCALING BROADCAST (for networks beyond a handful of nodes):")
+    print("   • Bound the fanout: send to ~1.4·ln(N)+9 peers instead of all N (never fewer than 6)")
+    print("   • Push the full object to only √fanout of those peers")
+    print("   • Announce just the hash to the rest; they fetch it if missing")
+    print("     (the existing request_block/block_response messages can serve the fetch)")
+    print("   • Sketch for Node.broadcast in network/p2p.py:")
+    print("     peers = list(self.connections)")
+    print("     fanout = max(6, int(1.4 * math.log(max(len(peers), 1)) + 9))")
+    print("     targets = random.sample(peers, min(fanout, len(peers)))")
+    print("     full_set = set(random.sample(targets, int(math.sqrt(len(targets)))))")
+    print("     announce_set = [p for p in targets if p not in full_set]")
+    print("   • Measure: messages per event drop from O(N) to O(log N) while coverage holds")
 
 def main():
     """Main function"""
@@ -219,19 +174,17 @@ def main():
     # Check if nodes are running
     print("Checking if nodes are running...")
     nodes_running = 0
-    for port in [5000, 5001, 5002]:
-        try:
-            response = requests.get(f'http://localhost:{port}/api/health', timeout=2)
-            if response.status_code == 200:
-                nodes_running += 1
-                print(f"✅ Node on port {port} is running")
-            else:
-                print(f"❌ Node on port {port} is not responding")
-        except:
+    for port, result in zip(PORTS, check_nodes(PORTS)):
+        if isinstance(result, BaseException):
             print(f"❌ Node on port {port} is not running")
+        elif result == 200:
+            nodes_running += 1
+            print(f"✅ Node on port {port} is running")
+        else:
+            print(f"❌ Node on port {port} is not responding")
     
-    if nodes_running < 3:
-        print(f"\n⚠️ Only {nodes_running}/3 nodes are running.")
+    if nodes_running < len(PORTS):
+        print(f"\n⚠️ Only {nodes_running}/{len(PORTS)} nodes are running.")
         print("Please start all nodes first using the multi-node guide.")
         return
     
@@ -241,10 +194,9 @@ def main():
     test_current_broadcasting()
     demonstrate_broadcasting_issue()
     suggest_simple_fixes()
-    create_broadcast_test()
     
     print("\n🎯 NEXT STEPS:")
-    print("1. Run the broadcast test: python broadcast_test.py")
+    print("1. Run the broadcast test: pytest tests/test_broadcast.py")
     print("2. Check the logs for P2P connection and broadcast errors")
     print("3. Implement the suggested fixes")
     print("4. Test again to verify broadcasting works")
@@ -8,10 +8,22 @@ import os
 import sys
 import time
 import json
-import shutil
+import select
+import asyncio
 import subprocess
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
+from api import LakhaAPI
+from network.health import check_nodes, fast_rmtree, wait_ready
+
+# One keep-alive connection pool shared by every call in this script
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=16,
+                                     max_retries=Retry(total=2, backoff_factor=0.1)))
+NODE_START_TIMEOUT = 30  # Seconds to wait for the node to start serving
+BATCH_TIMEOUT = 30  # Seconds allowed for one /api/batch mining call, however many blocks it holds
 
 class PreTestnetSetup:
     def __init__(self, db_path='lakha_db_pretestnet', api_port=5000):
@@ -19,13 +31,14 @@ class PreTestnetSetup:
         self.api_port = api_port
         self.api_url = f'http://localhost:{api_port}'
         self.node_process = None
+        self.node_log = None
         self.genesis_wallet = None
         
     def clean_database(self):
         """Clean/reset the database for fresh start"""
         print("🧹 Cleaning database...")
         if os.path.exists(self.db_path):
-            shutil.rmtree(self.db_path)
+            fast_rmtree(self.db_path)
         Path(self.db_path).mkdir(exist_ok=True)
         print(f"✅ Fresh database: {self.db_path}")
     
@@ -35,20 +48,37 @@ class PreTestnetSetup:
         cmd = [sys.executable, 'api.py', '--port', str(self.api_port), '--db-path', self.db_path]
         
         try:
-            self.node_process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            time.sleep(5)
-            return self.check_node_health()
+            # Send node output to a file: an undrained PIPE stalls the node once the buffer fills
+            self.node_log = open(os.path.join(self.db_path, 'node.log'), 'ab', buffering=0)
+            if os.name == 'nt':
+                # No fd inheritance for a readiness pipe on Windows: poll health instead
+                self.node_process = subprocess.Popen(cmd, stdout=self.node_log, stderr=subprocess.STDOUT)
+                return asyncio.run(wait_ready([self.api_port], timeout=NODE_START_TIMEOUT))
+            
+            # The node writes READY to this pipe once its server socket is listening
+            read_fd, write_fd = os.pipe()
+            try:
+                self.node_process = subprocess.Popen(cmd + ['--ready-fd', str(write_fd)], stdout=self.node_log,
+                                                     stderr=subprocess.STDOUT, pass_fds=(write_fd,))
+            finally:
+                os.close(write_fd)
+            try:
+                return self.wait_for_ready(read_fd)
+            finally:
+                os.close(read_fd)
         except Exception as e:
             print(f"❌ Failed to start node: {e}")
             return False
     
+    def wait_for_ready(self, read_fd, timeout=None):
+        """Block until the node signals READY on read_fd; False on timeout or if it exits first"""
+        ready, _, _ = select.select([read_fd], [], [], timeout or NODE_START_TIMEOUT)
+        # A node that dies before binding closes the pipe, which reads as EOF
+        return bool(ready) and os.read(read_fd, 16).startswith(b'READY')
+    
     def check_node_health(self):
         """Check if the node is healthy"""
-        try:
-            response = requests.get(f"{self.api_url}/api/health", timeout=5)
-            return response.status_code == 200
-        except:
-            return False
+        return check_nodes([self.api_port], timeout=5)[0] == 200
     
     def create_genesis_wallet(self):
         """Create genesis wallet using MemoryVault"""
@@ -56,7 +86,7 @@ class PreTestnetSetup:
         story = "I am the genesis validator of the Lakha blockchain."
         
         try:
-            response = requests.post(
+            response = SESSION.post(
                 f"{self.api_url}/api/memoryvault/create-funded-wallet",
                 json={"story": story, "funding_amount": 10000.0},
                 timeout=10
@@ -79,7 +109,7 @@ class PreTestnetSetup:
         
         print("🏛️ Registering validator...")
         try:
-            response = requests.post(
+            response = SESSION.post(
                 f"{self.api_url}/api/validators",
                 json={"address": self.genesis_wallet['address'], "stake_amount": 1000.0},
                 timeout=10
@@ -89,14 +119,24 @@ class PreTestnetSetup:
             return False
     
     def mine_blocks(self, count=3):
-        """Mine initial blocks"""
+        """Mine initial blocks; returns how many were actually mined"""
         print(f"⛏️ Mining {count} blocks...")
-        for i in range(count):
+        mined = 0
+        # The node runs a batch's sub-requests in order, so each call mines up to MAX_BATCH_SIZE blocks
+        # back to back; the mined count comes from the batch results rather than polling chain height
+        for start in range(0, count, LakhaAPI.MAX_BATCH_SIZE):
+            pipeline = [{'method': 'POST', 'path': '/api/mining/mine'}] * min(LakhaAPI.MAX_BATCH_SIZE, count - start)
             try:
-                requests.post(f"{self.api_url}/api/mining/mine", timeout=10)
-                time.sleep(1)
-            except:
-                pass
+                response = SESSION.post(f"{self.api_url}/api/batch", json={'pipeline': pipeline}, timeout=BATCH_TIMEOUT)
+                results = response.json()['data']
+            except Exception:
+                break
+            mined += sum(1 for result in results if result['status'] == 200)
+            # Mining stops once the pending pool is empty; further batches would only be refused
+            if any(result['status'] != 200 for result in results):
+                break
+        print(f"✅ Mined {mined}/{count} blocks")
+        return mined
     
     def run_setup(self):
         """Run complete setup"""
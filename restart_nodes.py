@@ -4,10 +4,19 @@ Node Restart Script
 Helps restart all nodes with clean state for proper synchronization
 """
 
+import asyncio
 import subprocess
 import time
 import os
-import shutil
+from concurrent.futures import ThreadPoolExecutor
+from network.health import check_nodes, fast_rmtree, save_rtts, wait_ready
+
+# P2P address of the node behind each API port, as peers refer to it
+P2P_URLS = {
+    5000: 'ws://localhost:8001',
+    5001: 'ws://localhost:8002',
+    5002: 'ws://localhost:8003'
+}
 
 def clean_databases():
     """Clean all node databases"""
@@ -19,18 +28,23 @@ def clean_databases():
         'lakha_db_node3'
     ]
     
+    existing = [db_path for db_path in db_paths if os.path.exists(db_path)]
     for db_path in db_paths:
-        if os.path.exists(db_path):
-            try:
-                shutil.rmtree(db_path)
-                print(f"   ✅ Cleaned {db_path}")
-            except Exception as e:
-                print(f"   ❌ Error cleaning {db_path}: {e}")
-        else:
+        if db_path not in existing:
             print(f"   ℹ️  {db_path} does not exist")
+    
+    # The trees are independent, so delete them concurrently
+    with ThreadPoolExecutor(max_workers=max(len(existing), 1)) as executor:
+        futures = {db_path: executor.submit(fast_rmtree, db_path) for db_path in existing}
+    for db_path, future in futures.items():
+        error = future.exception()
+        if error:
+            print(f"   ❌ Error cleaning {db_path}: {error}")
+        else:
+            print(f"   ✅ Cleaned {db_path}")
 
 def start_nodes():
-    """Start all nodes"""
+    """Start all nodes in the background and wait until they answer"""
     print("\n🚀 Starting nodes...")
     
     # Node 1 (no peers, will be the leader)
@@ -62,34 +76,53 @@ def start_nodes():
         '--p2p-peers', 'ws://localhost:8001', 'ws://localhost:8002'
     ]
     
-    print("\n📋 Commands to run in separate terminals:")
-    print("=" * 60)
-    print("Terminal 1 (Node 1):")
-    print("   " + " ".join(node1_cmd))
-    print("\nTerminal 2 (Node 2):")
-    print("   " + " ".join(node2_cmd))
-    print("\nTerminal 3 (Node 3):")
-    print("   " + " ".join(node3_cmd))
-    print("=" * 60)
-    
-    print("\n⏳ Wait for all nodes to start, then run:")
+    # Launch all three at once; nodes 2 and 3 keep retrying node 1 until it is listening
+    processes = []
+    log_paths = []
+    for i, cmd in enumerate([node1_cmd, node2_cmd, node3_cmd], 1):
+        log_path = f'node{i}.log'
+        with open(log_path, 'ab') as log:
+            processes.append(subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT))
+        log_paths.append(log_path)
+    
+    print("\n⏳ Waiting for nodes to become healthy...")
+    if asyncio.run(wait_ready([5000, 5001, 5002])):
+        print("   ✅ All nodes are up")
+    else:
+        print("   ❌ Not all nodes came up within 30s")
+        for log_path in log_paths:
+            with open(log_path, 'rb') as log:
+                tail = log.read().decode(errors='replace').splitlines()[-10:]
+            print(f"\n   --- {log_path} (last {len(tail)} lines) ---")
+            for line in tail:
+                print(f"   {line}")
+    
+    print("\n📋 Running nodes:")
+    for i, (process, log_path) in enumerate(zip(processes, log_paths), 1):
+        print(f"   Node {i}: pid {process.pid}, log {log_path}")
+    print(f"   Stop them with: kill {' '.join(str(p.pid) for p in processes)}")
+    
+    print("\n▶️  Next, run:")
     print("   python test_complete_p2p_flow.py")
+    return processes
 
 def check_node_status():
     """Check if nodes are running"""
     print("\n🔍 Checking node status...")
     
-    import requests
-    
-    for port in [5000, 5001, 5002]:
-        try:
-            response = requests.get(f'http://localhost:{port}/api/health', timeout=2)
-            if response.status_code == 200:
-                print(f"   ✅ Node {port}: Running")
-            else:
-                print(f"   ❌ Node {port}: Not responding properly")
-        except Exception as e:
-            print(f"   ❌ Node {port}: Not running - {e}")
+    ports = list(P2P_URLS)
+    rtts = {}
+    for port, result in zip(ports, check_nodes(ports, rtts=rtts)):
+        if isinstance(result, BaseException):
+            print(f"   ❌ Node {port}: Not running - {result!r}")
+        elif result == 200:
+            print(f"   ✅ Node {port}: Running ({rtts[port]:.1f} ms)")
+        else:
+            print(f"   ❌ Node {port}: Not responding properly")
+    
+    # Keep the RTTs so launchers can list the fastest peers first
+    if rtts:
+        save_rtts({P2P_URLS[port]: rtt for port, rtt in rtts.items()})
 
 def main():
     """Main function"""
@@ -108,8 +141,7 @@ def main():
         print("Skipping database cleanup.")
         start_nodes()
     
-    print("\n⏳ After starting all nodes, wait 10 seconds then run:")
-    print("   python check_node_status.py")
+    check_node_status()
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -9,6 +9,9 @@ import sys
 import os
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent.parent))
+from network.health import load_rtts, sort_by_rtt
+
 def main():
     parser = argparse.ArgumentParser(description='Run Lakha RPC Node')
     parser.add_argument('--port', type=int, default=5000, help='API port')
@@ -40,7 +43,8 @@ def main():
         cmd.extend(['--p2p-port', str(args.p2p_port)])
 
     if args.p2p_peers:
-        cmd.extend(['--p2p-peers'] + args.p2p_peers)
+        # Bootstrap from the lowest-latency peers first when probe RTTs have been recorded
+        cmd.extend(['--p2p-peers'] + sort_by_rtt(args.p2p_peers, load_rtts()))
 
     print(f"🚀 Starting Lakha RPC Node on port {args.port}")
     print(f"   Database: {args.db_path}")
@@ -48,12 +52,17 @@ def main():
     print(f"   Command: {' '.join(cmd)}")
     print("-" * 60)
 
-    try:
-        subprocess.run(cmd, check=True)
-    except KeyboardInterrupt:
-        print(f"\n🛑 Node on port {args.port} stopped")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Node on port {args.port} failed: {e}")
+    if os.name == 'nt':
+        # No exec on Windows: run the server as a child and pass its exit code through
+        try:
+            sys.exit(subprocess.call(cmd))
+        except KeyboardInterrupt:
+            print(f"\n🛑 Node on port {args.port} stopped")
+        return
+
+    # Become the server process; it handles its own signals and shutdown
+    sys.stdout.flush()
+    os.execv(sys.executable, cmd)
 
 if __name__ == '__main__':
     main()
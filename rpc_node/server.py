@@ -10,8 +10,13 @@ import threading
 import asyncio
 import argparse
 import hashlib
+import hmac
+import zlib
 from functools import wraps
-from flask import Flask, request, jsonify, Blueprint
+from itertools import islice
+import orjson
+from flask import Flask, request, jsonify, Blueprint, current_app
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 
 # Adjust import paths for the new directory structure
@@ -19,17 +24,37 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from core import LahkaBlockchain, Transaction, TransactionType
+from core import LahkaBlockchain, Transaction, TransactionType, encode_json
 from address import generate_address, is_valid_address
 
 # --- Globals --- #
 blockchain: LahkaBlockchain = None
 authority_address: str = None
+# Reads run concurrently on the server's threads; anything that mutates the chain goes through this lock
+write_lock = threading.Lock()
 
 # --- Logging --- #
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# --- JSON --- #
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by every jsonify call"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return encode_json(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(encode_json(obj), mimetype='application/json')
+
+def orjson_response(payload):
+    """Encode payload straight to a JSON response, skipping the provider indirection"""
+    return current_app.response_class(encode_json(payload), mimetype='application/json')
+
 # --- Authentication --- #
 def require_api_key(f):
     @wraps(f)
@@ -40,6 +65,32 @@ def require_api_key(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def serialize_writes(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with write_lock:
+            return f(*args, **kwargs)
+    return decorated_function
+
+# --- Conditional GETs --- #
+def not_modified(etag):
+    """A bodiless 304 if the client already holds etag, else None"""
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    return None
+
+def with_etag(response, etag):
+    """Tag a response so pollers can revalidate it cheaply"""
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'public, max-age=1'
+    return response
+
+def chain_etag():
+    """Changes whenever a block is appended"""
+    return f'{len(blockchain.chain)}-{blockchain.get_latest_block().hash[:16]}'
+
 # --- Blueprints --- #
 
 # Status Blueprint (Public)
@@ -51,13 +102,25 @@ def health_check():
 
 @status_bp.route('/status', methods=['GET'])
 def get_status():
+    # The status also reports pool, validator and contract counts, which move between blocks
+    etag = (f'{chain_etag()}-{len(blockchain.pending_transactions)}'
+            f'-{len(blockchain.validators)}-{len(blockchain.contract_engine.contracts)}')
+    cached = not_modified(etag)
+    if cached:
+        return cached
     chain_info = blockchain.get_chain_info()
-    return jsonify({'status': 'success', 'data': chain_info})
+    return with_etag(jsonify({'status': 'success', 'data': chain_info}), etag)
 
 @status_bp.route('/validators', methods=['GET'])
 def get_validators():
-    validators = {addr: val.to_dict() for addr, val in blockchain.validators.items()}
-    return jsonify({'status': 'success', 'data': validators})
+    validators_json = blockchain.get_validators_json()
+    # Validator state also changes outside blocks, so tag the cached encoding itself
+    etag = f'{zlib.crc32(validators_json):08x}-{len(validators_json)}'
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    body = b'{"status":"success","data":' + validators_json + b'}'
+    return with_etag(current_app.response_class(body, mimetype='application/json'), etag)
 
 @status_bp.route('/validators/<address>', methods=['GET'])
 def get_validator(address):
@@ -89,52 +152,60 @@ def get_blocks():
     limit = min(int(request.args.get('limit', 10)), 100)
     start = (page - 1) * limit
     end = start + limit
-    blocks = [b.to_dict() for b in blockchain.chain[start:end]]
-    return jsonify({
-        'status': 'success',
-        'data': {
-            'blocks': blocks,
-            'page': page,
-            'limit': limit,
-            'total': len(blockchain.chain)
-        }
-    })
+    # Blocks are append-only, so any page only changes when the chain does
+    etag = chain_etag()
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    # Splice each block's cached encoding into the envelope rather than rebuilding its dict
+    blocks = b','.join(b.to_json() for b in blockchain.chain[start:end])
+    meta = orjson.dumps({'page': page, 'limit': limit, 'total': len(blockchain.chain)})
+    body = b'{"status":"success","data":{"blocks":[' + blocks + b'],' + meta[1:] + b'}'
+    return with_etag(current_app.response_class(body, mimetype='application/json'), etag)
 
 @blockchain_bp.route('/transactions/pending', methods=['GET'])
 def get_pending_transactions():
-    pending_txs = [tx.to_dict() for tx in blockchain.pending_transactions]
-    return jsonify({
+    """Pending pool, or one page of it when page/limit are given"""
+    pending = blockchain.pending_transactions
+    start, end = 0, len(pending)
+    if 'page' in request.args or 'limit' in request.args:
+        page = int(request.args.get('page', 1))
+        limit = min(int(request.args.get('limit', 10)), 100)
+        start = (page - 1) * limit
+        end = start + limit
+    # orjson encodes the Transaction dataclasses itself, with the same keys as to_dict()
+    pending_txs = list(islice(pending, start, end))
+    # count is how many transactions this response holds; total is the size of the whole pool
+    return orjson_response({
         'status': 'success',
         'data': {
             'transactions': pending_txs,
-            'count': len(pending_txs)
+            'count': len(pending_txs),
+            'total': len(pending)
         }
     })
 
 @blockchain_bp.route('/transactions', methods=['GET'])
 def get_transactions():
-    all_transactions = []
-    for block in blockchain.chain:
-        all_transactions.extend(block.transactions)
-
     page = int(request.args.get('page', 1))
     limit = min(int(request.args.get('limit', 10)), 100)
     start = (page - 1) * limit
     end = start + limit
     
-    transactions = [tx.to_dict() for tx in all_transactions[start:end]]
+    transactions = blockchain.get_transactions_page(start, end)
     
-    return jsonify({
+    return orjson_response({
         'status': 'success',
         'data': {
             'transactions': transactions,
             'page': page,
             'limit': limit,
-            'total': len(all_transactions)
+            'total': blockchain.get_transaction_count()
         }
     })
 
 @blockchain_bp.route('/faucet', methods=['POST'])
+@serialize_writes
 def faucet():
     data = request.get_json()
     if not data or 'address' not in data:
@@ -145,6 +216,8 @@ def faucet():
 
     if not is_valid_address(address):
         return jsonify({'status': 'error', 'message': 'Invalid address'}), 400
+    # Interned so the ledger's dict lookups on this key compare by identity
+    address = sys.intern(address)
 
     genesis_account = blockchain.ledger.get_account('genesis')
     if not genesis_account:
@@ -197,6 +270,7 @@ def get_nonce(address):
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 @blockchain_bp.route('/validators', methods=['POST'])
+@serialize_writes
 def register_validator():
     data = request.get_json()
     if not data:
@@ -244,6 +318,7 @@ def validate_story_personalness():
     })
 
 @memoryvault_bp.route('/memoryvault/create-funded-wallet', methods=['POST'])
+@serialize_writes
 def create_funded_wallet():
     data = request.get_json()
     if not data or 'story' not in data:
@@ -288,6 +363,7 @@ def _fund_address(address: str, amount: float) -> dict:
     try:
         if not is_valid_address(address):
             return {'success': False, 'error': 'Invalid address'}
+        address = sys.intern(address)
         
         genesis_account = blockchain.ledger.get_account('genesis')
         if not genesis_account:
@@ -327,10 +403,13 @@ def _verify_sha256_signature(address: str, message: str, signature: str) -> bool
     # This is NOT secure for production.
     
     # Re-create the expected signature using the address as a 'secret'
-    expected_signature = hashlib.sha256((message + address).encode()).hexdigest()
-    return expected_signature == signature
+    digest = hashlib.sha256(message.encode())
+    digest.update(address.encode())
+    # Compare as bytes so a non-ASCII signature is rejected rather than raising
+    return hmac.compare_digest(digest.hexdigest().encode(), str(signature).encode())
 
 @blockchain_bp.route('/mining/mine', methods=['POST'])
+@serialize_writes
 def mine_block():
     data = request.get_json()
     if not data:
@@ -343,16 +422,17 @@ def mine_block():
     if not all([address, message, signature]):
         return jsonify({'status': 'error', 'message': 'Missing address, message, or signature'}), 400
 
-    # Verify the signature
-    if not _verify_sha256_signature(address, message, signature):
-        return jsonify({'status': 'error', 'message': 'Invalid signature'}), 401
-
+    # Cheap checks first so unregistered callers and empty pools never pay for a hash
     # Check if the address is a registered validator
     if address not in blockchain.validators:
         return jsonify({'status': 'error', 'message': 'Only registered validators can mine'}), 403
 
     if not blockchain.pending_transactions:
         return jsonify({'status': 'error', 'message': 'No pending transactions to mine'}), 400
+
+    # Verify the signature
+    if not _verify_sha256_signature(address, message, signature):
+        return jsonify({'status': 'error', 'message': 'Invalid signature'}), 401
     
     success = blockchain.mine_block()
     if success:
@@ -367,6 +447,7 @@ def create_app(db_path, p2p_port, p2p_peers, auth_address):
     global blockchain, authority_address
     
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     CORS(app)
 
     # Initialize blockchain and set authority address
@@ -404,6 +485,7 @@ def main():
     parser.add_argument('--p2p-port', type=int, help='P2P port')
     parser.add_argument('--p2p-peers', nargs='*', help='P2P peer addresses')
     parser.add_argument('--authority-keypair', required=True, help='Path to the authority keypair JSON file')
+    parser.add_argument('--threads', type=int, default=16, help='Request worker threads')
 
     args = parser.parse_args()
 
@@ -426,7 +508,15 @@ def main():
     )
 
     logger.info(f"Starting Lakha RPC Node authorized for: {auth_address}")
-    app.run(host=args.host, port=args.port, debug=False)
+    # One process with a thread pool: LevelDB allows a single opener, so pre-forked workers
+    # could not each hold the database
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning("waitress not installed; falling back to the Flask development server")
+        app.run(host=args.host, port=args.port, debug=False, threaded=True)
+        return
+    serve(app, host=args.host, port=args.port, threads=args.threads)
 
 if __name__ == '__main__':
     main()
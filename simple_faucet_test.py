@@ -4,15 +4,23 @@ Simple Faucet Test
 """
 
 import requests
-import json
+import orjson
 
 API_URL = 'http://localhost:5000'
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+def post_json(session, url, payload):
+    """POST a body pre-encoded with orjson rather than requests' stdlib json"""
+    return session.post(url, data=orjson.dumps(payload), headers=JSON_HEADERS)
 
 def test_faucet_step_by_step():
     """Test faucet step by step"""
     print("🧪 Simple Faucet Test")
     print("=" * 30)
     
+    # One keep-alive connection for all three steps
+    session = requests.Session()
+    
     # Test address
     test_address = "lakha1nmrwxp97kq6qeqsgrfy84zpsvn9afndn0472jh"
     
@@ -20,7 +28,7 @@ def test_faucet_step_by_step():
     print(f"\n1️⃣ Validating address: {test_address}")
     validate_data = {'address': test_address}
     try:
-        response = requests.post(f"{API_URL}/api/utils/validate-address", json=validate_data)
+        response = post_json(session, f"{API_URL}/api/utils/validate-address", validate_data)
         print(f"   Status: {response.status_code}")
         print(f"   Response: {response.text}")
     except Exception as e:
@@ -34,12 +42,12 @@ def test_faucet_step_by_step():
     }
     
     try:
-        response = requests.post(f"{API_URL}/api/faucet", json=faucet_data)
+        response = post_json(session, f"{API_URL}/api/faucet", faucet_data)
         print(f"   Status: {response.status_code}")
         print(f"   Response: {response.text}")
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"   ✅ Success: {data['data']['message']}")
         else:
             print(f"   ❌ Failed")
@@ -49,9 +57,9 @@ def test_faucet_step_by_step():
     # Step 3: Check pending transactions
     print(f"\n3️⃣ Checking pending transactions...")
     try:
-        response = requests.get(f"{API_URL}/api/transactions/pending")
+        response = session.get(f"{API_URL}/api/transactions/pending")
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             count = data['data']['count']
             print(f"   📊 Pending: {count}")
             if count > 0:
@@ -61,6 +69,8 @@ def test_faucet_step_by_step():
             print(f"   ❌ Failed: {response.status_code}")
     except Exception as e:
         print(f"   ❌ Error: {e}")
+    finally:
+        session.close()
 
 if __name__ == '__main__':
     test_faucet_step_by_step() 
\ No newline at end of file
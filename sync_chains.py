@@ -4,155 +4,162 @@ Chain Synchronization Script
 Synchronizes blockchain chains across all nodes
 """
 
-import requests
-import json
+import asyncio
 import time
+import aiohttp
 
-def get_chain_info(node_port):
+PORTS = (5000, 5001, 5002)
+SYNC_TIMEOUT = 10.0   # Seconds test_chain_sync waits for the chains to converge
+POLL_INTERVAL = 0.5   # Seconds between chain-length polls while waiting
+
+# url -> (ETag, decoded body) of the last 200 response, for If-None-Match revalidation
+_etag_cache = {}
+
+async def _fetch(session, url):
+    """GET url and return its decoded JSON body, or None on a non-200 response"""
+    cached = _etag_cache.get(url)
+    headers = {'If-None-Match': cached[0]} if cached else None
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304 and cached:
+            return cached[1]
+        if response.status != 200:
+            return None
+        body = await response.json()
+        etag = response.headers.get('ETag')
+        if etag:
+            _etag_cache[url] = (etag, body)
+        return body
+
+async def get_chain_info(session, node_port):
     """Get chain information from a node"""
     try:
-        response = requests.get(f'http://localhost:{node_port}/api/status')
-        if response.status_code == 200:
-            return response.json()['data']
-        else:
-            return None
+        body = await _fetch(session, f'http://localhost:{node_port}/api/status')
+        return body['data'] if body else None
     except Exception as e:
         print(f"Error getting chain info from port {node_port}: {e}")
         return None
 
-def get_blocks(node_port, start_index=0, limit=100):
+async def get_blocks(session, node_port, start_index=0, limit=100):
     """Get blocks from a node"""
     try:
-        response = requests.get(f'http://localhost:{node_port}/api/blocks?page=1&limit={limit}')
-        if response.status_code == 200:
-            return response.json()['data']['blocks']
-        else:
-            return []
+        body = await _fetch(session, f'http://localhost:{node_port}/api/blocks?page=1&limit={limit}')
+        return body['data']['blocks'] if body else []
     except Exception as e:
         print(f"Error getting blocks from port {node_port}: {e}")
         return []
 
-def sync_chains():
+async def get_all_chain_info(session):
+    """Fetch chain information from every node at once, in PORTS order"""
+    return await asyncio.gather(*(get_chain_info(session, port) for port in PORTS))
+
+async def get_p2p_status(session, port):
+    """Get a node's P2P status line"""
+    try:
+        body = await _fetch(session, f'http://localhost:{port}/api/p2p/status')
+        if body:
+            p2p_info = body['data']
+            return f"   Port {port}: {p2p_info['connections']} connections, enabled: {p2p_info['enabled']}"
+        return f"   Port {port}: P2P status unavailable"
+    except Exception as e:
+        return f"   Port {port}: Error getting P2P status - {e}"
+
+async def sync_chains(session):
     """Synchronize chains across all nodes"""
     print("🔄 Chain Synchronization Script")
     print("=" * 50)
-    
+
     # Get chain info from all nodes
     print("1️⃣ Getting current chain status...")
-    node1_info = get_chain_info(5000)
-    node2_info = get_chain_info(5001)
-    node3_info = get_chain_info(5002)
-    
-    if not all([node1_info, node2_info, node3_info]):
+    infos = await get_all_chain_info(session)
+
+    if not all(infos):
         print("❌ Could not get chain info from all nodes")
         return
-    
-    print(f"   Node 1: {node1_info['chain_length']} blocks")
-    print(f"   Node 2: {node2_info['chain_length']} blocks")
-    print(f"   Node 3: {node3_info['chain_length']} blocks")
-    
+
+    for i, info in enumerate(infos, 1):
+        print(f"   Node {i}: {info['chain_length']} blocks")
+
     # Find the node with the longest chain (should be Node 1)
-    max_blocks = max(node1_info['chain_length'], node2_info['chain_length'], node3_info['chain_length'])
-    leader_node = None
-    
-    if node1_info['chain_length'] == max_blocks:
-        leader_node = 5000
-        print(f"   ✅ Node 1 is the leader with {max_blocks} blocks")
-    elif node2_info['chain_length'] == max_blocks:
-        leader_node = 5001
-        print(f"   ✅ Node 2 is the leader with {max_blocks} blocks")
-    elif node3_info['chain_length'] == max_blocks:
-        leader_node = 5002
-        print(f"   ✅ Node 3 is the leader with {max_blocks} blocks")
-    
-    if not leader_node:
-        print("❌ Could not determine leader node")
-        return
-    
+    lengths = [info['chain_length'] for info in infos]
+    max_blocks = max(lengths)
+    leader_index = lengths.index(max_blocks)
+    leader_node = PORTS[leader_index]
+    print(f"   ✅ Node {leader_index + 1} is the leader with {max_blocks} blocks")
+
     # Get all blocks from the leader
     print(f"\n2️⃣ Getting all blocks from leader (port {leader_node})...")
-    all_blocks = get_blocks(leader_node, 0, max_blocks)
+    all_blocks = await get_blocks(session, leader_node, 0, max_blocks)
     print(f"   Retrieved {len(all_blocks)} blocks")
-    
+
     if not all_blocks:
         print("❌ Could not retrieve blocks from leader")
         return
-    
+
     # Show block details
     print("\n3️⃣ Block chain details:")
     for i, block in enumerate(all_blocks):
         print(f"   Block #{block['index']}: {block['hash'][:16]}... (prev: {block['previous_hash'][:16]}...)")
-    
+
     # Check if chains are already synchronized
     print("\n4️⃣ Checking if chains need synchronization...")
-    nodes_to_sync = []
-    
-    if node1_info['chain_length'] < max_blocks:
-        nodes_to_sync.append(5000)
-    if node2_info['chain_length'] < max_blocks:
-        nodes_to_sync.append(5001)
-    if node3_info['chain_length'] < max_blocks:
-        nodes_to_sync.append(5002)
-    
+    nodes_to_sync = [port for port, length in zip(PORTS, lengths) if length < max_blocks]
+
     if not nodes_to_sync:
         print("   ✅ All chains are already synchronized!")
         return
-    
+
     print(f"   Nodes that need sync: {nodes_to_sync}")
-    
+
     # For now, we can't directly sync chains via API
     # The P2P network should handle this automatically
     print("\n5️⃣ Chain synchronization strategy:")
     print("   📋 The P2P network should automatically sync chains")
     print("   📋 If not working, you may need to restart the nodes")
     print("   📋 Or manually trigger block requests")
-    
+
     # Check if P2P is working
     print("\n6️⃣ Checking P2P status...")
-    for port in [5000, 5001, 5002]:
-        try:
-            response = requests.get(f'http://localhost:{port}/api/p2p/status')
-            if response.status_code == 200:
-                p2p_info = response.json()['data']
-                print(f"   Port {port}: {p2p_info['connections']} connections, enabled: {p2p_info['enabled']}")
-            else:
-                print(f"   Port {port}: P2P status unavailable")
-        except Exception as e:
-            print(f"   Port {port}: Error getting P2P status - {e}")
-    
+    for line in await asyncio.gather(*(get_p2p_status(session, port) for port in PORTS)):
+        print(line)
+
     print("\n7️⃣ Recommendations:")
     print("   🔄 Restart all nodes to ensure clean state")
     print("   🔄 Make sure P2P connections are established")
     print("   🔄 Submit a new transaction to trigger sync")
     print("   🔄 Mine a new block to test propagation")
 
-def test_chain_sync():
-    """Test if chains are synchronized after some time"""
+async def test_chain_sync(session):
+    """Test if chains are synchronized within SYNC_TIMEOUT"""
     print("\n🔄 Testing Chain Synchronization")
     print("=" * 50)
-    
-    # Wait a bit for P2P sync
-    print("⏳ Waiting 10 seconds for P2P synchronization...")
-    time.sleep(10)
-    
+
+    # Poll until the chains agree instead of sleeping for the whole window
+    print(f"⏳ Waiting up to {SYNC_TIMEOUT:.0f} seconds for P2P synchronization...")
+    deadline = time.monotonic() + SYNC_TIMEOUT
+    while True:
+        infos = await get_all_chain_info(session)
+        synced = all(infos) and len({info['chain_length'] for info in infos}) == 1
+        if synced or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(POLL_INTERVAL)
+
     # Check chain lengths again
     print("📊 Checking chain lengths after wait...")
-    node1_info = get_chain_info(5000)
-    node2_info = get_chain_info(5001)
-    node3_info = get_chain_info(5002)
-    
-    if all([node1_info, node2_info, node3_info]):
-        print(f"   Node 1: {node1_info['chain_length']} blocks")
-        print(f"   Node 2: {node2_info['chain_length']} blocks")
-        print(f"   Node 3: {node3_info['chain_length']} blocks")
-        
-        if node1_info['chain_length'] == node2_info['chain_length'] == node3_info['chain_length']:
+    if all(infos):
+        for i, info in enumerate(infos, 1):
+            print(f"   Node {i}: {info['chain_length']} blocks")
+
+        if synced:
             print("   ✅ Chains are synchronized!")
         else:
             print("   ❌ Chains are still not synchronized")
     else:
         print("   ❌ Could not get chain info")
 
+async def main():
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
+        await sync_chains(session)
+        await test_chain_sync(session)
+
 if __name__ == '__main__':
-    sync_chains()
-    test_chain_sync() 
\ No newline at end of file
+    asyncio.run(main())
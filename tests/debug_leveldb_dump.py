@@ -1,6 +1,9 @@
 import plyvel
-import json
+import orjson
 import os
+import sys
+
+FLUSH_EVERY = 1000  # Entries buffered between writes to stdout
 
 def dump_leveldb(db_path):
     if not os.path.exists(db_path):
@@ -8,24 +11,31 @@ def dump_leveldb(db_path):
         return
     db = plyvel.DB(db_path, create_if_missing=False)
     print(f"\n--- Dumping LevelDB at {db_path} ---\n")
-    for key, value in db:
+    lines = []
+    # One-shot scan: keep it out of LevelDB's block cache
+    for key, value in db.iterator(verify_checksums=False, fill_cache=False):
         try:
             k = key.decode()
         except Exception:
             k = str(key)
-        try:
-            v = value.decode()
-        except Exception:
-            v = str(value)
-        if k.startswith('block:'):
+        if key.startswith(b'block:'):
+            # orjson parses the raw bytes, so block values are never decoded to str
             try:
-                v_json = json.loads(v)
-                print(f"{k}: [Block index: {v_json.get('index')}, Hash: {v_json.get('hash')}]\n  Transactions: {len(v_json.get('transactions', []))}")
+                v_json = orjson.loads(value)
+                lines.append(f"{k}: [Block index: {v_json.get('index')}, Hash: {v_json.get('hash')}]\n  Transactions: {len(v_json.get('transactions', []))}\n")
             except Exception:
-                print(f"{k}: [Could not decode block JSON]")
+                lines.append(f"{k}: [Could not decode block JSON]\n")
         else:
-            print(f"{k}: {v[:100]}{'...' if len(v) > 100 else ''}")
+            try:
+                v = value.decode()
+            except Exception:
+                v = str(value)
+            lines.append(f"{k}: {v[:100]}{'...' if len(v) > 100 else ''}\n")
+        if len(lines) >= FLUSH_EVERY:
+            sys.stdout.write(''.join(lines))
+            lines.clear()
+    sys.stdout.write(''.join(lines))
     db.close()
 
 if __name__ == "__main__":
-    dump_leveldb("test_lakha_db") 
\ No newline at end of file
+    dump_leveldb("test_lakha_db")
@@ -3,101 +3,258 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core import LahkaBlockchain, Transaction, TransactionType
-from address import generate_address
-import json
+from address import generate_address, is_valid_address
+import orjson
+import io
+import tempfile
+from collections import namedtuple
+from contextlib import contextmanager, redirect_stdout
 
-# Generate Bech32 addresses ONCE for all demo users
-alice = generate_address()
-bob = generate_address()
-charlie = generate_address()
-teacher = generate_address()
-addresses = [alice, bob, charlie, teacher]
+# Kept outside the source tree so the cache never shows up as an untracked file
+ADDRESS_CACHE = os.path.join(tempfile.gettempdir(), 'lakha_demo_addrs.json')
+# Set LAHKA_QUIET (e.g. on CI) to run the demo's chain operations without the state dumps
+QUIET = bool(os.environ.get('LAHKA_QUIET'))
+
+def _load_or_generate_addresses(path=ADDRESS_CACHE, count=4):
+    """Reuse the demo users' addresses from earlier runs, generating and saving them on a miss"""
+    try:
+        with open(path, 'rb') as f:
+            cached = orjson.loads(f.read())
+        if len(cached) == count and all(is_valid_address(address) for address in cached):
+            return cached
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        pass
+    generated = [generate_address() for _ in range(count)]
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(generated))
+    return generated
+
+# Demo users as parallel columns; a stake of 0 means the user does not register as a validator.
+# Addresses are generated once and kept across runs
+Users = namedtuple('Users', 'names addrs stakes')
+USERS = Users(
+    names=('alice', 'bob', 'charlie', 'teacher'),
+    addrs=tuple(_load_or_generate_addresses()),
+    stakes=(20.0, 15.0, 0.0, 30.0)
+)
+alice, bob, charlie, teacher = USERS.addrs
+addresses = list(USERS.addrs)
+
+# Transaction types the demo builds, bound once instead of looked up on the enum per transaction
+_TT_TRANSFER = TransactionType.TRANSFER
+_TT_DEPLOY = TransactionType.CONTRACT_DEPLOY
+
+# Contract source deployed by the demo. The engine stores it verbatim in the transaction data,
+# which must stay JSON-serializable, so it is kept as source rather than a compiled code object
+SCHOOL_RECORDS_CONTRACT = """
+    class SchoolRecords:
+        def __init__(self):
+            self.students = {}
+            self.grades = {}
+        
+        def add_student(self, student_id, name):
+            self.students[student_id] = name
+            return True
+        
+        def add_grade(self, student_id, subject, grade):
+            if student_id not in self.grades:
+                self.grades[student_id] = {}
+            self.grades[student_id][subject] = grade
+            return True
+        
+        def get_student_info(self, student_id):
+            return {
+                'name': self.students.get(student_id, 'Unknown'),
+                'grades': self.grades.get(student_id, {})
+            }
+    """
+
+def pretty_json(obj):
+    """Indented JSON for display, encoded by orjson"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+@contextmanager
+def buffered_stdout(buffer_size=65536):
+    """Send all output, core's debug prints included, through one large UTF-8 buffer flushed on exit"""
+    if not hasattr(sys.stdout, 'buffer'):
+        # Captured or replaced stdout (e.g. under pytest): leave it alone
+        yield
+        return
+    sys.stdout.flush()
+    text = io.TextIOWrapper(io.BufferedWriter(sys.stdout.buffer, buffer_size),
+                            encoding='utf-8', write_through=False)
+    try:
+        with redirect_stdout(text):
+            yield
+    finally:
+        text.flush()
+        # Unwrap without closing the real stdout underneath
+        text.detach().detach()
+
+def emit(lines):
+    """Write a section's lines with one stdout call instead of a print per line"""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+SEPARATOR = "=" * 60
+
+def separator_lines(title):
+    return [f"\n{SEPARATOR}", f"  {title}", SEPARATOR]
 
 def print_separator(title):
-    print(f"\n{'='*60}")
-    print(f"  {title}")
-    print(f"{'='*60}")
+    if QUIET:
+        return
+    emit(separator_lines(title))
+
+def blockchain_state_lines(lahka, title="Current Blockchain State"):
+    return separator_lines(title) + [
+        f"📊 Chain Length: {len(lahka.chain)} blocks",
+        f"⏳ Pending Transactions: {len(lahka.pending_transactions)}",
+        f"👥 Validators: {len(lahka.validators)}",
+        f"📄 Smart Contracts: {len(lahka.contract_engine.contracts)}",
+        f"💰 Total Supply: {lahka.ledger.get_total_supply():.2f} LAHKA",
+    ]
 
 def print_blockchain_state(lahka, title="Current Blockchain State"):
-    print_separator(title)
-    print(f"📊 Chain Length: {len(lahka.chain)} blocks")
-    print(f"⏳ Pending Transactions: {len(lahka.pending_transactions)}")
-    print(f"👥 Validators: {len(lahka.validators)}")
-    print(f"📄 Smart Contracts: {len(lahka.contract_engine.contracts)}")
-    print(f"💰 Total Supply: {lahka.ledger.get_total_supply():.2f} LAHKA")
-
-def print_balances(lahka, title="Account Balances"):
-    print_separator(title)
-    accounts = lahka.ledger.get_accounts_summary()
+    if QUIET:
+        return
+    emit(blockchain_state_lines(lahka, title))
+
+def accounts_summary(lahka, cache=None):
+    """Ledger summary, reused from cache while the chain height and account count are unchanged"""
+    if cache is None:
+        return lahka.ledger.get_accounts_summary()
+    key = (len(lahka.chain), len(lahka.ledger.accounts))
+    if cache.get('key') != key:
+        cache['key'], cache['summary'] = key, lahka.ledger.get_accounts_summary()
+    return cache['summary']
+
+def balances_lines(lahka, title="Account Balances", cache=None):
+    lines = separator_lines(title)
+    accounts = accounts_summary(lahka, cache)
     for address, info in accounts.items():
-        print(f"🏦 {address}: {info['balance']:.2f} LAHKA (tx: {info['transaction_count']})")
+        lines.append(f"🏦 {address}: {info['balance']:.2f} LAHKA (tx: {info['transaction_count']})")
+    return lines
+
+def print_balances(lahka, title="Account Balances", cache=None):
+    if QUIET:
+        return
+    emit(balances_lines(lahka, title, cache))
+
+VALIDATOR_TEMPLATE = (
+    "👤 {address}:\n"
+    "   💰 Staked: {stake:.2f} LAHKA\n"
+    "   🏆 Blocks Validated: {blocks_validated}\n"
+    "   💎 Total Rewards: {total_rewards:.2f} LAHKA\n"
+    "   ⭐ Reputation: {reputation:.1f}"
+)
+
+def validators_lines(lahka, title="Validators"):
+    lines = separator_lines(title)
+    # One format call per validator; fields are passed by name rather than via asdict(), which deep-copies
+    lines.extend(
+        VALIDATOR_TEMPLATE.format(
+            address=address,
+            stake=validator.stake,
+            blocks_validated=validator.blocks_validated,
+            total_rewards=validator.total_rewards,
+            reputation=validator.reputation
+        )
+        for address, validator in lahka.validators.items()
+    )
+    return lines
 
 def print_validators(lahka, title="Validators"):
-    print_separator(title)
-    for address, validator in lahka.validators.items():
-        print(f"👤 {address}:")
-        print(f"   💰 Staked: {validator.stake:.2f} LAHKA")
-        print(f"   🏆 Blocks Validated: {validator.blocks_validated}")
-        print(f"   💎 Total Rewards: {validator.total_rewards:.2f} LAHKA")
-        print(f"   ⭐ Reputation: {validator.reputation:.1f}")
+    if QUIET:
+        return
+    emit(validators_lines(lahka, title))
 
 def print_contracts(lahka, title="Smart Contracts"):
-    print_separator(title)
+    if QUIET:
+        return
+    lines = separator_lines(title)
     for address, contract in lahka.contract_engine.contracts.items():
-        print(f"📄 Contract {address[:10]}...:")
-        print(f"   👤 Owner: {contract.owner}")
-        print(f"   📊 Status: {contract.status.value}")
-        print(f"   📅 Created: {contract.created_at}")
-        print(f"   💾 State: {json.dumps(contract.data, indent=2)}")
+        lines += [
+            f"📄 Contract {address[:10]}...:",
+            f"   👤 Owner: {contract.owner}",
+            f"   📊 Status: {contract.status.value}",
+            f"   📅 Created: {contract.created_at}",
+            f"   💾 State: {pretty_json(contract.data)}",
+        ]
+    emit(lines)
 
 def print_recent_blocks(lahka, title="Recent Blocks", count=5):
-    print_separator(title)
-    for block in lahka.chain[-count:]:
-        print(f"🔗 Block #{block.index}:")
-        print(f"   ⏰ Timestamp: {block.timestamp}")
-        print(f"   👤 Validator: {block.validator}")
-        print(f"   📝 Transactions: {len(block.transactions)}")
-        print(f"   🔗 Previous Hash: {block.previous_hash[:10]}...")
-        print(f"   🆔 Hash: {block.hash[:10]}...")
+    if QUIET:
+        return
+    print_recent_blocks_from(lahka.chain[-count:], title)
+
+def recent_blocks_lines(blocks, title="Recent Blocks"):
+    lines = separator_lines(title)
+    for block in blocks:
+        lines += [
+            f"🔗 Block #{block.index}:",
+            f"   ⏰ Timestamp: {block.timestamp}",
+            f"   👤 Validator: {block.validator}",
+            f"   📝 Transactions: {len(block.transactions)}",
+            f"   🔗 Previous Hash: {block.previous_hash[:10]}...",
+            f"   🆔 Hash: {block.hash[:10]}...",
+        ]
+    return lines
+
+def print_recent_blocks_from(blocks, title="Recent Blocks"):
+    """Print blocks the caller has already picked out of the chain"""
+    if QUIET:
+        return
+    emit(recent_blocks_lines(blocks, title))
+
+TRANSACTION_TEMPLATE = (
+    "🆔 Hash: {hash}\n"
+    "👤 From: {from_address}\n"
+    "👥 To: {to_address}\n"
+    "💰 Amount: {amount:.2f} LAHKA\n"
+    "📋 Type: {transaction_type.value}\n"
+    "⛽ Gas Limit: {gas_limit}\n"
+    "⛽ Gas Price: {gas_price}\n"
+    "⏰ Timestamp: {timestamp}"
+)
 
 def print_transaction_details(tx, title="Transaction Details"):
-    print_separator(title)
-    print(f"🆔 Hash: {tx.hash}")
-    print(f"👤 From: {tx.from_address}")
-    print(f"👥 To: {tx.to_address}")
-    print(f"💰 Amount: {tx.amount:.2f} LAHKA")
-    print(f"📋 Type: {tx.transaction_type.value}")
-    print(f"⛽ Gas Limit: {tx.gas_limit}")
-    print(f"⛽ Gas Price: {tx.gas_price}")
-    print(f"⏰ Timestamp: {tx.timestamp}")
+    if QUIET:
+        return
+    # format_map reads the fields straight from the instance dict, without copying it
+    lines = separator_lines(title) + [TRANSACTION_TEMPLATE.format_map(vars(tx))]
     if tx.data:
-        print(f"📄 Data: {json.dumps(tx.data, indent=2)}")
+        lines.append(f"📄 Data: {pretty_json(tx.data)}")
+    emit(lines)
 
 def interactive_demo():
     print("🚀 LAHKA BLOCKCHAIN INTERACTIVE DEMO")
-    print("=" * 60)
+    print(SEPARATOR)
     
     # Create blockchain
     print("\n📦 Creating new LAHKA blockchain...")
     lahka = LahkaBlockchain()
+    # Balances only move when a block is mined, so the summary is cached for this demo's ledger
+    summary_cache = {}
     print_blockchain_state(lahka, "Initial State")
     
     # Show genesis block
     print_recent_blocks(lahka, "Genesis Block", 1)
     
-    print(f"\n👥 Creating test addresses: {', '.join(addresses)}")
+    print(f"\n👥 Creating test addresses: {', '.join(USERS.addrs)}")
     
     # Add transfer transactions
     print("\n📤 Adding transfer transactions...")
-    for i, address in enumerate(addresses):
-        transfer_tx = Transaction(
+    transfer_txs = [
+        Transaction(
             from_address="genesis",
             to_address=address,
             amount=100.0,
-            transaction_type=TransactionType.TRANSFER
+            transaction_type=_TT_TRANSFER
         )
-        lahka.add_transaction(transfer_tx)
-        print(f"   ✅ Added transfer: genesis → {address} (100 LAHKA)")
+        for address in USERS.addrs
+    ]
+    for address, added in zip(USERS.addrs, lahka.add_transactions(transfer_txs)):
+        print(f"   {'✅ Added' if added else '❌ Rejected'} transfer: genesis → {address} (100 LAHKA)")
     
     print_blockchain_state(lahka, "After Adding Transfers")
     
@@ -105,22 +262,20 @@ def interactive_demo():
     print("\n⛏️ Mining first block (genesis validator)...")
     success = lahka.mine_block()
     print(f"   {'✅' if success else '❌'} Block mined: {success}")
+    # The chain tail is taken once per phase and handed to the printers
+    recent = lahka.chain[-4:]
     
     print_blockchain_state(lahka, "After First Block")
-    print_balances(lahka, "Balances After First Block")
-    print_recent_blocks(lahka, "Blockchain After First Block", 2)
+    print_balances(lahka, "Balances After First Block", summary_cache)
+    print_recent_blocks_from(recent[-2:], "Blockchain After First Block")
     
     # Register validators
     print("\n👥 Registering validators...")
-    validator_stakes = {
-        alice: 20.0,
-        bob: 15.0,
-        teacher: 30.0
-    }
+    validator_stakes = {address: stake for address, stake in zip(USERS.addrs, USERS.stakes) if stake}
     
+    registered = lahka.register_validators(validator_stakes)
     for address, stake in validator_stakes.items():
-        success = lahka.register_validator(address, stake)
-        print(f"   {'✅' if success else '❌'} {address}: {stake} LAHKA staked")
+        print(f"   {'✅' if registered[address] else '❌'} {address}: {stake} LAHKA staked")
     
     print_blockchain_state(lahka, "After Validator Registration")
     
@@ -130,40 +285,18 @@ def interactive_demo():
     print(f"   {'✅' if success else '❌'} Block mined: {success}")
     
     print_blockchain_state(lahka, "After Second Block")
-    print_balances(lahka, "Balances After Second Block")
+    print_balances(lahka, "Balances After Second Block", summary_cache)
     print_validators(lahka, "Validator Status")
     
     # Deploy smart contract
     print("\n📄 Deploying smart contract...")
-    contract_code = """
-    class SchoolRecords:
-        def __init__(self):
-            self.students = {}
-            self.grades = {}
-        
-        def add_student(self, student_id, name):
-            self.students[student_id] = name
-            return True
-        
-        def add_grade(self, student_id, subject, grade):
-            if student_id not in self.grades:
-                self.grades[student_id] = {}
-            self.grades[student_id][subject] = grade
-            return True
-        
-        def get_student_info(self, student_id):
-            return {
-                'name': self.students.get(student_id, 'Unknown'),
-                'grades': self.grades.get(student_id, {})
-            }
-    """
     
     deploy_tx = Transaction(
         from_address=alice,
         to_address="",
-        transaction_type=TransactionType.CONTRACT_DEPLOY,
+        transaction_type=_TT_DEPLOY,
         data={
-            'contract_code': contract_code,
+            'contract_code': SCHOOL_RECORDS_CONTRACT,
             'initial_state': {
                 'students': {},
                 'grades': {}
@@ -183,22 +316,28 @@ def interactive_demo():
     print_contracts(lahka, "Deployed Contracts")
     
     # Show final state
-    print_separator("FINAL BLOCKCHAIN STATE")
-    print_blockchain_state(lahka, "Complete State")
-    print_balances(lahka, "Final Balances")
-    print_validators(lahka, "Final Validator Status")
-    print_recent_blocks(lahka, "Complete Blockchain", 4)
+    # The final sections are read-only, so they are rendered together and written in one call
+    if not QUIET:
+        emit(
+            separator_lines("FINAL BLOCKCHAIN STATE")
+            + blockchain_state_lines(lahka, "Complete State")
+            + balances_lines(lahka, "Final Balances", summary_cache)
+            + validators_lines(lahka, "Final Validator Status")
+            + recent_blocks_lines(lahka.chain[-4:], "Complete Blockchain")
+        )
     
     # Show some transaction history
     print_separator("TRANSACTION HISTORY")
-    for address in addresses[:2]:  # Show first 2 addresses
-        history = lahka.ledger.get_account_history(address, 5)
-        print(f"\n📜 {address}'s recent transactions:")
-        for entry in history:
-            print(f"   💰 {entry.amount:+.2f} LAHKA - {entry.description}")
+    if not QUIET:
+        # Show first 2 addresses
+        for address, history in lahka.ledger.get_accounts_history(addresses[:2], 5).items():
+            print(f"\n📜 {address}'s recent transactions:")
+            for entry in history:
+                print(f"   💰 {entry.amount:+.2f} LAHKA - {entry.description}")
     
     print("\n🎉 Interactive demo completed!")
     print("💡 You can now explore the blockchain state and see how everything works!")
 
 if __name__ == "__main__":
-    interactive_demo() 
\ No newline at end of file
+    with buffered_stdout():
+        interactive_demo() 
\ No newline at end of file
@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from core import LahkaBlockchain, Transaction, TransactionType
+from address import generate_address
+
+@pytest.fixture
+def blockchain(tmp_path):
+    blockchain = LahkaBlockchain(db_path=str(tmp_path / "db"))
+    yield blockchain
+    blockchain.close()
+
+def test_add_transactions_checks_batch_against_itself(blockchain):
+    """A batch is validated against the pool and against its own earlier entries"""
+    nonce = blockchain.ledger.get_account('genesis').nonce
+    first, duplicate_nonce, next_nonce = [
+        Transaction(
+            from_address='genesis',
+            to_address=generate_address(),
+            amount=1.0,
+            transaction_type=TransactionType.TRANSFER,
+            nonce=tx_nonce
+        )
+        for tx_nonce in (nonce, nonce, nonce + 1)
+    ]
+    assert blockchain.add_transactions([first, duplicate_nonce, first]) == [True, False, False]
+    # The pool built up by the batch still rejects replays on a single add
+    assert blockchain.add_transaction(first) is False
+    assert blockchain.add_transactions([next_nonce]) == [True]
+    assert [tx.hash for tx in blockchain.pending_transactions] == [first.hash, next_nonce.hash]
+
+def test_register_validators_batch(blockchain):
+    """Valid registrations in a batch succeed together; bad entries fail without blocking the rest"""
+    alice, bob = generate_address(), generate_address()
+    nonce = blockchain.ledger.get_account('genesis').nonce
+    funding = [
+        Transaction(from_address='genesis', to_address=address, amount=100.0,
+                    transaction_type=TransactionType.TRANSFER, nonce=nonce + i)
+        for i, address in enumerate((alice, bob))
+    ]
+    assert blockchain.add_transactions(funding) == [True, True]
+    assert blockchain.mine_block()
+
+    results = blockchain.register_validators({alice: 20.0, bob: 15.0, 'not-an-address': 20.0})
+    assert results == {alice: True, bob: True, 'not-an-address': False}
+    assert set(blockchain.validators) >= {alice, bob}
+    stake_senders = {tx.from_address for tx in blockchain.pending_transactions
+                     if tx.transaction_type == TransactionType.STAKE}
+    assert stake_senders == {alice, bob}
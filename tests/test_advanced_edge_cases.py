@@ -1,25 +1,44 @@
+"""
+Advanced edge cases for smart contracts, consensus and the ledger.
+Every test opens its own blockchain under tmp_path, so the file can run across workers:
+    pytest tests/test_advanced_edge_cases.py -n auto
+"""
+
 import pytest
 import time
 import sys
 import os
-import copy
-import random
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from core import LahkaBlockchain, Transaction, TransactionType, ContractStatus
+from core import LahkaBlockchain, Transaction, TransactionType, ContractStatus, SmartContractEngine
 from address import generate_address
 
+FEATURES = SmartContractEngine.FEATURES
+
+
+def funded_address(bc, amount):
+    """New address credited straight through the ledger, for tests that only need a funded sender"""
+    address = generate_address()
+    bc.ledger.update_balance(address, amount, "", len(bc.chain), "Test funding")
+    return address
+
 
 class TestAdvancedEdgeCases:
     """Test advanced edge cases for smart contracts, consensus, and ledger"""
     
-    def setup_method(self):
-        """Set up fresh blockchain for each test"""
-        self.lahka = LahkaBlockchain()
+    @pytest.fixture(autouse=True)
+    def lahka(self, tmp_path):
+        """Fresh blockchain for each test in its own throwaway DB"""
+        # The shared default 'lakha_db' grew with every test and was reloaded in full before each one;
+        # an empty DB only costs the genesis block
+        self.lahka = LahkaBlockchain(db_path=str(tmp_path / "db"))
+        yield self.lahka
+        self.lahka.close()
     
     # ============================================================================
     # 1. ADVANCED SMART CONTRACT EDGE CASES
     # ============================================================================
     
+    @pytest.mark.skipif(not FEATURES['reentrancy_guard'], reason="contract engine has no reentrancy guard yet")
     def test_contract_reentrancy_attack(self):
         """Test reentrancy attack prevention in smart contracts"""
         # Deploy a vulnerable contract that allows reentrancy
@@ -39,9 +58,7 @@ class TestAdvancedEdgeCases:
             # This should fail if reentrancy protection is in place
         """
         
-        addr = generate_address()
-        self.lahka.add_transaction(Transaction("genesis", addr, 10000.0, TransactionType.TRANSFER))
-        self.lahka.mine_block()
+        addr = funded_address(self.lahka, 10000.0)
         
         # Deploy vulnerable contract
         deploy_tx = Transaction(
@@ -61,11 +78,10 @@ class TestAdvancedEdgeCases:
         # The test passes if the system either accepts or rejects based on security policy
         assert result in [True, False], "Contract deployment should be handled safely"
     
+    @pytest.mark.skipif(not FEATURES['self_destruct'], reason="contract engine does not support self-destruction yet")
     def test_contract_self_destruction(self):
         """Test contract self-destruction and state cleanup"""
-        addr = generate_address()
-        self.lahka.add_transaction(Transaction("genesis", addr, 10000.0, TransactionType.TRANSFER))
-        self.lahka.mine_block()
+        addr = funded_address(self.lahka, 10000.0)
         
         # Deploy a contract with self-destruct functionality
         contract_code = """
@@ -115,11 +131,10 @@ class TestAdvancedEdgeCases:
             result = self.lahka.add_transaction(destroy_tx)
             assert result in [True, False], "Self-destruction should be handled safely"
     
+    @pytest.mark.skipif(not FEATURES['gas_metering'], reason="contract engine does not meter gas yet")
     def test_gas_exhaustion_dos(self):
         """Test gas exhaustion/DoS prevention in contract execution"""
-        addr = generate_address()
-        self.lahka.add_transaction(Transaction("genesis", addr, 100000.0, TransactionType.TRANSFER))
-        self.lahka.mine_block()
+        addr = funded_address(self.lahka, 100000.0)
         
         # Deploy a contract with infinite loop (gas exhaustion attack)
         infinite_loop_code = """
@@ -163,9 +178,7 @@ class TestAdvancedEdgeCases:
     
     def test_contract_state_corruption(self):
         """Test handling of malformed state and unexpected types"""
-        addr = generate_address()
-        self.lahka.add_transaction(Transaction("genesis", addr, 10000.0, TransactionType.TRANSFER))
-        self.lahka.mine_block()
+        addr = funded_address(self.lahka, 10000.0)
         
         # Try to deploy contract with malformed state (sanitized for JSON)
         malformed_state = {
@@ -194,11 +207,10 @@ class TestAdvancedEdgeCases:
         result = self.lahka.add_transaction(deploy_tx)
         assert result in [True, False], "Malformed state should be handled safely"
     
+    @pytest.mark.skipif(not FEATURES['contract_isolation'], reason="contract engine does not isolate contract state yet")
     def test_unauthorized_contract_access(self):
         """Test prevention of unauthorized state access between contracts"""
-        addr = generate_address()
-        self.lahka.add_transaction(Transaction("genesis", addr, 10000.0, TransactionType.TRANSFER))
-        self.lahka.mine_block()
+        addr = funded_address(self.lahka, 10000.0)
         
         # Deploy two contracts
         contract_a_code = """
@@ -342,26 +354,21 @@ class TestAdvancedEdgeCases:
     # 3. LEDGER/ACCOUNTING EDGE CASES
     # ============================================================================
     
-    def test_dust_transactions(self):
+    @pytest.mark.parametrize("dust_amount", [0.000001, 0.0000001, 0.00000001, 0.000000001])
+    def test_dust_transactions(self, dust_amount):
         """Test handling of very small amount transactions (dust)"""
-        addr = generate_address()
-        self.lahka.add_transaction(Transaction("genesis", addr, 1000.0, TransactionType.TRANSFER))
-        self.lahka.mine_block()
+        addr = funded_address(self.lahka, 1000.0)
         
-        # Test various dust amounts
-        dust_amounts = [0.000001, 0.0000001, 0.00000001, 0.000000001]
+        dust_tx = Transaction(
+            from_address=addr,
+            to_address=generate_address(),
+            amount=dust_amount,
+            transaction_type=TransactionType.TRANSFER
+        )
         
-        for dust_amount in dust_amounts:
-            dust_tx = Transaction(
-                from_address=addr,
-                to_address=generate_address(),
-                amount=dust_amount,
-                transaction_type=TransactionType.TRANSFER
-            )
-            
-            # System should handle dust transactions gracefully
-            result = self.lahka.add_transaction(dust_tx)
-            assert result in [True, False], f"Dust transaction {dust_amount} should be handled safely"
+        # System should handle dust transactions gracefully
+        result = self.lahka.add_transaction(dust_tx)
+        assert result in [True, False], f"Dust transaction {dust_amount} should be handled safely"
     
     def test_account_deletion_zero_balance(self):
         """Test what happens when account balance reaches zero"""
@@ -370,14 +377,6 @@ class TestAdvancedEdgeCases:
         gas_cost = 21000 * 1.0  # gas_limit * gas_price
         self.lahka.add_transaction(Transaction("genesis", addr, 100.0 + gas_cost, TransactionType.TRANSFER))
         self.lahka.mine_block()
-        print("[DEBUG] Chain after first mining:")
-        for i, block in enumerate(self.lahka.chain):
-            print(f"  Block {i}: {[tx.to_dict() for tx in block.transactions]}")
-        
-        # Check account state before drain transaction
-        account = self.lahka.ledger.get_account(addr)
-        print(f"[DEBUG] Account balance before drain: {self.lahka.get_balance(addr)}")
-        print(f"[DEBUG] Account nonce before drain: {account.nonce if account else 'No account'}")
         
         # Transfer all balance away (including gas cost)
         drain_tx = Transaction(
@@ -388,15 +387,9 @@ class TestAdvancedEdgeCases:
             nonce=0  # First transaction from this account
         )
         
-        accepted = self.lahka.add_transaction(drain_tx)
-        print(f"[DEBUG] Transfer transaction accepted: {accepted}")
-        print(f"[DEBUG] Pending transactions before mining: {[tx.to_dict() for tx in self.lahka.pending_transactions]}")
+        assert self.lahka.add_transaction(drain_tx), "Drain transaction should be accepted"
         self.lahka.mine_block()
-        print(f"[DEBUG] Pending transactions after mining: {[tx.to_dict() for tx in self.lahka.pending_transactions]}")
-        print(f"[DEBUG] Last block transactions: {[tx.to_dict() for tx in self.lahka.chain[-1].transactions]}")
-        print("[DEBUG] Chain after second mining:")
-        for i, block in enumerate(self.lahka.chain):
-            print(f"  Block {i}: {[tx.to_dict() for tx in block.transactions]}")
+        assert drain_tx.hash in {tx.hash for tx in self.lahka.chain[-1].transactions}, "Drain transaction should be mined"
         
         # Check if account still exists with zero balance
         balance = self.lahka.get_balance(addr)
@@ -407,19 +400,18 @@ class TestAdvancedEdgeCases:
         account = self.lahka.ledger.get_account(addr)
         assert account is not None, "Account should still exist even with zero balance"
     
-    def test_contract_state_overflow(self):
+    @pytest.mark.parametrize("key, value", [
+        ('counter', 999999999999999999),  # Very large number
+        ('negative_counter', -999999999999999999),  # Very negative number
+        ('float_value', 1e308),  # Near float max
+        ('tiny_value', 1e-308)  # Near float min
+    ])
+    def test_contract_state_overflow(self, key, value):
         """Test overflow/underflow in contract state variables"""
-        addr = generate_address()
-        self.lahka.add_transaction(Transaction("genesis", addr, 10000.0, TransactionType.TRANSFER))
-        self.lahka.mine_block()
+        addr = funded_address(self.lahka, 10000.0)
         
         # Deploy contract with potential overflow state
-        overflow_state = {
-            'counter': 999999999999999999,  # Very large number
-            'negative_counter': -999999999999999999,  # Very negative number
-            'float_value': 1e308,  # Near float max
-            'tiny_value': 1e-308  # Near float min
-        }
+        overflow_state = {key: value}
         
         deploy_tx = Transaction(
             from_address=addr,
@@ -434,7 +426,7 @@ class TestAdvancedEdgeCases:
         
         # System should handle overflow-prone state safely
         result = self.lahka.add_transaction(deploy_tx)
-        assert result in [True, False], "Overflow-prone state should be handled safely"
+        assert result in [True, False], f"Overflow-prone state {key}={value} should be handled safely"
     
     def test_extreme_balance_values(self):
         """Test handling of extreme balance values"""
@@ -472,32 +464,29 @@ class TestAdvancedEdgeCases:
     def test_concurrent_transaction_processing(self):
         """Test handling of many concurrent transactions"""
         # Create many addresses and fund them with enough for transactions + gas
-        addresses = [generate_address() for _ in range(10)]
         gas_cost = 21000 * 1.0  # gas_limit * gas_price
-        for addr in addresses:
-            # Fund with enough for 5 transactions + gas each
-            total_needed = 5 * (1.0 + gas_cost)
-            self.lahka.add_transaction(Transaction("genesis", addr, total_needed, TransactionType.TRANSFER))
-        self.lahka.mine_block()
+        # Fund with enough for 5 transactions + gas each
+        total_needed = 5 * (1.0 + gas_cost)
+        addresses = [funded_address(self.lahka, total_needed) for _ in range(10)]
+        
+        # Create many concurrent transactions, 5 per address; recipients and the timestamp are made up front
+        recipients = iter([generate_address() for _ in range(len(addresses) * 5)])
+        now = time.time()
+        concurrent_txs = [
+            Transaction(
+                from_address=addr,
+                to_address=next(recipients),
+                amount=1.0,
+                transaction_type=TransactionType.TRANSFER,
+                nonce=j,
+                timestamp=now
+            )
+            for addr in addresses
+            for j in range(5)
+        ]
         
-        # Create many concurrent transactions
-        concurrent_txs = []
-        for i, addr in enumerate(addresses):
-            for j in range(5):  # 5 transactions per address
-                tx = Transaction(
-                    from_address=addr,
-                    to_address=generate_address(),
-                    amount=1.0,
-                    transaction_type=TransactionType.TRANSFER,
-                    nonce=j
-                )
-                concurrent_txs.append(tx)
-        
-        # Add all transactions
-        added_count = 0
-        for tx in concurrent_txs:
-            if self.lahka.add_transaction(tx):
-                added_count += 1
+        # Add all transactions in one batch
+        added_count = sum(self.lahka.add_transactions(concurrent_txs))
         
         # System should handle concurrent transactions gracefully
         assert added_count > 0, "Some concurrent transactions should be accepted"
@@ -505,9 +494,7 @@ class TestAdvancedEdgeCases:
     
     def test_malformed_transaction_data(self):
         """Test handling of malformed transaction data"""
-        addr = generate_address()
-        self.lahka.add_transaction(Transaction("genesis", addr, 1000.0, TransactionType.TRANSFER))
-        self.lahka.mine_block()
+        addr = funded_address(self.lahka, 1000.0)
         
         # Test contract call with malformed data
         malformed_tx = Transaction(
@@ -531,9 +518,7 @@ class TestAdvancedEdgeCases:
         # Register many validators rapidly
         validators = []
         for i in range(5):
-            addr = generate_address()
-            self.lahka.add_transaction(Transaction("genesis", addr, 1000.0, TransactionType.TRANSFER))
-            self.lahka.mine_block()
+            addr = funded_address(self.lahka, 1000.0)
             
             # Register validator
             success = self.lahka.register_validator(addr, 100.0)
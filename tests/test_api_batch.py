@@ -0,0 +1,84 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import shutil
+from core import LahkaBlockchain
+from api import LakhaAPI
+from address import generate_address
+
+def make_client(db_path):
+    """Create an in-process API client backed by a fresh test DB"""
+    if os.path.exists(db_path):
+        shutil.rmtree(db_path)
+    blockchain = LahkaBlockchain(db_path=db_path)
+    api = LakhaAPI(blockchain)
+    return blockchain, api.app.test_client()
+
+def test_batch_pipeline():
+    db_path = 'test_lakha_db_batch'
+    blockchain, client = make_client(db_path)
+    try:
+        resp = client.post('/api/batch', json={'pipeline': [
+            {'method': 'GET', 'path': '/api/status'},
+            {'method': 'GET', 'path': '/api/p2p/status'},
+            {'method': 'GET', 'path': '/api/blocks/999'}
+        ]})
+        assert resp.status_code == 200
+        results = resp.get_json()['data']
+        assert len(results) == 3
+        assert results[0]['status'] == 200
+        assert results[0]['body']['data']['chain_length'] == len(blockchain.chain)
+        assert results[1]['status'] == 200
+        assert results[1]['body']['data']['enabled'] is False
+        assert results[2]['status'] == 404
+    finally:
+        blockchain.close()
+        shutil.rmtree(db_path)
+
+def test_batch_rejects_invalid_paths():
+    db_path = 'test_lakha_db_batch_invalid'
+    blockchain, client = make_client(db_path)
+    try:
+        # Missing pipeline
+        resp = client.post('/api/batch', json={})
+        assert resp.status_code == 400
+
+        # Nested batches and non-API paths are not dispatched
+        resp = client.post('/api/batch', json={'pipeline': [
+            {'method': 'POST', 'path': '/api/batch'},
+            {'method': 'GET', 'path': '/'}
+        ]})
+        results = resp.get_json()['data']
+        assert [r['status'] for r in results] == [400, 400]
+
+        # Oversized batches are refused
+        resp = client.post('/api/batch', json={'pipeline': [{'path': '/api/health'}] * (LakhaAPI.MAX_BATCH_SIZE + 1)})
+        assert resp.status_code == 400
+    finally:
+        blockchain.close()
+        shutil.rmtree(db_path)
+
+def test_transactions_batch():
+    db_path = 'test_lakha_db_tx_batch'
+    blockchain, client = make_client(db_path)
+    try:
+        alice = generate_address()
+        genesis_nonce = blockchain.ledger.get_account('genesis').nonce
+        resp = client.post('/api/transactions/batch', json={'transactions': [
+            {'from_address': 'genesis', 'to_address': alice, 'amount': 10.0,
+             'transaction_type': 'transfer', 'gas_limit': 100, 'nonce': genesis_nonce},
+            {'from_address': 'genesis', 'to_address': alice, 'transaction_type': 'transfer'}
+        ]})
+        assert resp.status_code == 200
+        data = resp.get_json()['data']
+        assert data['accepted'] == 1
+        assert data['rejected'] == 1
+        assert data['results'][0]['status'] == 'success'
+        assert data['results'][1]['status'] == 'error'
+        assert [tx.hash for tx in blockchain.pending_transactions] == [data['results'][0]['transaction_hash']]
+
+        resp = client.post('/api/transactions/batch', json={'transactions': 'not-a-list'})
+        assert resp.status_code == 400
+    finally:
+        blockchain.close()
+        shutil.rmtree(db_path)
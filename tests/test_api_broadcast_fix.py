@@ -1,144 +1,92 @@
 #!/usr/bin/env python3
 """
 Test API Broadcast Fix
-Tests that the API broadcasting fix works correctly
+Tests that a transaction submitted through one node's API is broadcast to its peers.
+The three nodes run in-process behind Flask test clients, and node 1's P2P layer is a
+loopback that hands messages straight to the other nodes' inbound handler.
 """
 
-import requests
-import time
-import json
-from address import generate_address
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+import threading
+import pytest
+from core import LahkaBlockchain
+from api import LakhaAPI
 
-def test_api_broadcast():
-    """Test API broadcasting with the fix"""
-    print("🔍 Testing API Broadcast Fix")
-    print("=" * 50)
-    
-    # Test parameters
-    node1_url = "http://localhost:5000"
-    node2_url = "http://localhost:5001"
-    node3_url = "http://localhost:5002"
-    
-    print("📋 Instructions:")
-    print("1. Make sure your 3 nodes are running on ports 5000, 5001, 5002")
-    print("2. Watch the node terminals for P2P broadcast logs")
-    print("3. Look for '[P2P] Broadcasting transaction' messages")
-    
-    # Step 1: Check node health
-    print("\n1️⃣ Checking node health...")
-    try:
-        health1 = requests.get(f"{node1_url}/api/health").json()
-        health2 = requests.get(f"{node2_url}/api/health").json()
-        health3 = requests.get(f"{node3_url}/api/health").json()
-        print("   ✅ All nodes are healthy")
-    except Exception as e:
-        print(f"   ❌ Node health check failed: {e}")
-        return
-    
-    # Step 2: Check P2P status
-    print("\n2️⃣ Checking P2P status...")
-    try:
-        p2p1 = requests.get(f"{node1_url}/api/p2p/status").json()
-        p2p2 = requests.get(f"{node2_url}/api/p2p/status").json()
-        p2p3 = requests.get(f"{node3_url}/api/p2p/status").json()
-        
-        print(f"   Node 1: {p2p1['data']['connections']} connections")
-        print(f"   Node 2: {p2p2['data']['connections']} connections")
-        print(f"   Node 3: {p2p3['data']['connections']} connections")
-        
-        if p2p1['data']['connections'] > 0 and p2p2['data']['connections'] > 0 and p2p3['data']['connections'] > 0:
-            print("   ✅ P2P connections are active")
-        else:
-            print("   ⚠️  Some nodes have no P2P connections")
-    except Exception as e:
-        print(f"   ❌ P2P status check failed: {e}")
-        return
-    
-    # Step 3: Generate address
-    print("\n3️⃣ Generating test address...")
-    try:
-        address_resp = requests.post(f"{node1_url}/api/utils/generate-address").json()
-        address = address_resp['data']['address']
-        print(f"   Address: {address}")
-    except Exception as e:
-        print(f"   ❌ Address generation failed: {e}")
-        return
-    
-    # Step 4: Get genesis nonce
-    print("\n4️⃣ Getting genesis nonce...")
-    try:
-        nonce_resp = requests.get(f"{node1_url}/api/accounts/genesis/nonce").json()
-        nonce = nonce_resp['data']['nonce']
-        print(f"   Genesis nonce: {nonce}")
-    except Exception as e:
-        print(f"   ❌ Nonce retrieval failed: {e}")
-        return
-    
-    # Step 5: Submit transaction (should trigger broadcast)
-    print("\n5️⃣ Submitting transaction (should trigger broadcast)...")
-    print("   ⚠️  WATCH YOUR NODE TERMINALS FOR P2P LOGS!")
-    
-    try:
-        tx_data = {
-            "from_address": "genesis",
-            "to_address": address,
-            "amount": 25.0,
-            "transaction_type": "transfer",
-            "gas_limit": 21000,
-            "gas_price": 1.0,
-            "nonce": nonce
-        }
-        
-        tx_resp = requests.post(f"{node1_url}/api/transactions", json=tx_data).json()
-        
-        if tx_resp['status'] == 'success':
-            print(f"   ✅ Transaction submitted: {tx_resp['data']['transaction_hash']}")
-            print("   📡 Check your node terminals for P2P broadcast logs!")
-        else:
-            print(f"   ❌ Transaction failed: {tx_resp}")
-    except Exception as e:
-        print(f"   ❌ Transaction submission failed: {e}")
-        return
-    
-    # Step 6: Wait and check propagation
-    print("\n6️⃣ Waiting for propagation...")
-    time.sleep(3)
-    
-    # Step 7: Check pending transactions on all nodes
-    print("\n7️⃣ Checking transaction propagation...")
+PROPAGATION_TIMEOUT = 1.0  # Seconds the broadcast may take to reach the peers
+
+class LoopbackP2P:
+    """Stands in for P2PNode: broadcasts go directly to the peer blockchains' handlers"""
+
+    def __init__(self, peers, delivered: threading.Event):
+        self.connections = dict(enumerate(peers))
+        self.delivered = delivered
+
+    async def broadcast(self, msg_type, payload):
+        if msg_type == 'transaction':
+            for peer in self.connections.values():
+                await peer.handle_incoming_transaction(payload, None)
+        self.delivered.set()
+
+@pytest.fixture
+def nodes(tmp_path):
+    """Three API nodes; node 1 broadcasts to nodes 2 and 3 on its own event loop thread"""
+    chains = [LahkaBlockchain(db_path=str(tmp_path / f"node{i}")) for i in range(1, 4)]
+    apis = [LakhaAPI(chain) for chain in chains]
+    delivered = threading.Event()
+    chains[0].p2p_node = LoopbackP2P(chains[1:], delivered)
+
+    loop = asyncio.new_event_loop()
+    running = threading.Event()
+    loop.call_soon(running.set)
+    loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+    loop_thread.start()
+    # _submit_broadcast drops broadcasts while the loop is not yet running
+    running.wait()
+    apis[0].p2p_loop = loop
     try:
-        pending1 = requests.get(f"{node1_url}/api/transactions/pending").json()
-        pending2 = requests.get(f"{node2_url}/api/transactions/pending").json()
-        pending3 = requests.get(f"{node3_url}/api/transactions/pending").json()
-        
-        print(f"   Node 1 pending: {pending1['data']['count']}")
-        print(f"   Node 2 pending: {pending2['data']['count']}")
-        print(f"   Node 3 pending: {pending3['data']['count']}")
-        
-        # Check if transaction propagated
-        tx_hash = tx_resp['data']['transaction_hash']
-        tx_in_node2 = any(tx['hash'] == tx_hash for tx in pending2['data']['transactions'])
-        tx_in_node3 = any(tx['hash'] == tx_hash for tx in pending3['data']['transactions'])
-        
-        print(f"   Transaction in Node 2: {tx_in_node2}")
-        print(f"   Transaction in Node 3: {tx_in_node3}")
-        
-        if tx_in_node2 and tx_in_node3:
-            print("   ✅ Transaction successfully propagated!")
-        else:
-            print("   ❌ Transaction did not propagate")
-            
-    except Exception as e:
-        print(f"   ❌ Propagation check failed: {e}")
-    
-    print("\n📝 What to look for in your node terminals:")
-    print("✅ [P2P] Broadcasting transaction message to X peers")
-    print("✅ [P2P] Successfully sent transaction message to peer")
-    print("✅ [P2P] Broadcast completed: X/X messages sent")
-    print("✅ [P2P] Received message: {\"type\": \"transaction\"...}")
-    print("✅ [P2P] Adding received transaction [hash]")
-    
-    print("\n🎉 Test completed! Check your node terminals for the P2P logs above.")
+        yield [api.app.test_client() for api in apis], delivered
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join()
+        loop.close()
+        for chain in chains:
+            chain.close()
+
+def test_api_broadcast(nodes):
+    """Test API broadcasting with the fix"""
+    clients, delivered = nodes
+    node1 = clients[0]
+
+    # All nodes answer, and node 1 sees both peers
+    for client in clients:
+        assert client.get('/api/health').status_code == 200
+    p2p = node1.get('/api/p2p/status').get_json()['data']
+    assert p2p['enabled'] is True
+    assert p2p['connections'] == 2
+
+    address = node1.post('/api/utils/generate-address').get_json()['data']['address']
+    nonce = node1.get('/api/accounts/genesis/nonce').get_json()['data']['nonce']
+
+    # Submitting on node 1 should trigger the broadcast
+    resp = node1.post('/api/transactions', json={
+        'from_address': 'genesis',
+        'to_address': address,
+        'amount': 25.0,
+        'transaction_type': 'transfer',
+        'gas_limit': 21000,
+        'gas_price': 1.0,
+        'nonce': nonce
+    })
+    assert resp.status_code == 200, resp.get_json()
+    tx_hash = resp.get_json()['data']['transaction_hash']
+
+    assert delivered.wait(timeout=PROPAGATION_TIMEOUT), "broadcast did not run"
+    for i, client in enumerate(clients, 1):
+        pending = client.get('/api/transactions/pending').get_json()['data']['transactions']
+        assert tx_hash in {tx['hash'] for tx in pending}, f"transaction not pending on node {i}"
 
 if __name__ == "__main__":
-    test_api_broadcast() 
\ No newline at end of file
+    sys.exit(pytest.main([__file__, '-q']))
@@ -5,7 +5,11 @@ Checks the format of API responses to understand the structure
 """
 
 import requests
-import json
+import orjson
+
+def pretty(response):
+    """Decode a response body with orjson and re-encode it indented for display"""
+    return orjson.dumps(orjson.loads(response.content), option=orjson.OPT_INDENT_2).decode()
 
 def test_api_format():
     """Test API response format"""
@@ -19,19 +23,19 @@ def test_api_format():
         print("1️⃣ Testing /api/status endpoint...")
         status_resp = requests.get(f"{node1_url}/api/status")
         print(f"   Status code: {status_resp.status_code}")
-        print(f"   Response: {json.dumps(status_resp.json(), indent=2)}")
+        print(f"   Response: {pretty(status_resp)}")
         
         # Test pending transactions endpoint
         print("\n2️⃣ Testing /api/transactions/pending endpoint...")
         pending_resp = requests.get(f"{node1_url}/api/transactions/pending")
         print(f"   Status code: {pending_resp.status_code}")
-        print(f"   Response: {json.dumps(pending_resp.json(), indent=2)}")
+        print(f"   Response: {pretty(pending_resp)}")
         
         # Test health endpoint
         print("\n3️⃣ Testing /api/health endpoint...")
         health_resp = requests.get(f"{node1_url}/api/health")
         print(f"   Status code: {health_resp.status_code}")
-        print(f"   Response: {json.dumps(health_resp.json(), indent=2)}")
+        print(f"   Response: {pretty(health_resp)}")
         
     except Exception as e:
         print(f"❌ Test failed: {e}")
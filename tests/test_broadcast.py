@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Broadcast Test
+Submits a transaction on Node 1 and checks it reaches every node's pending pool.
+Needs the three local nodes from restart_nodes.py; skipped when they are not running.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import time
+import http.client
+import orjson
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from network.health import check_nodes
+
+PORTS = (5000, 5001, 5002)
+PENDING_PATH = '/api/transactions/pending'
+SUBMIT_URL = f'http://localhost:{PORTS[0]}'
+PROPAGATION_TIMEOUT = 10.0  # Seconds a node may take to receive the transaction
+
+# One keep-alive connection pool shared by every request in this module
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=16,
+                                     max_retries=Retry(total=2, backoff_factor=0.1)))
+
+# Raw keep-alive connections for the polling loop, which skip requests' per-call machinery
+CONNECTIONS = {}
+
+def fast_get(port, path):
+    """GET path from a local node over a reused http.client connection; returns (status, body)"""
+    for attempt in (1, 2):
+        conn = CONNECTIONS.get(port)
+        if conn is None:
+            conn = CONNECTIONS[port] = http.client.HTTPConnection('localhost', port, timeout=2)
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, ConnectionError):
+            # The server dropped the idle connection: reconnect once
+            conn.close()
+            del CONNECTIONS[port]
+            if attempt == 2:
+                raise
+
+@pytest.fixture(scope='module')
+def tx_hash():
+    """Submit one genesis transfer on Node 1 and return its hash"""
+    if any(result != 200 for result in check_nodes(PORTS)):
+        pytest.skip(f"local nodes on ports {PORTS} are not all running")
+
+    response = SESSION.post(f'{SUBMIT_URL}/api/utils/generate-address')
+    assert response.status_code == 200
+    address = response.json()['data']['address']
+
+    nonce = SESSION.get(f'{SUBMIT_URL}/api/accounts/genesis/nonce').json()['data']['nonce']
+    response = SESSION.post(f'{SUBMIT_URL}/api/transactions', json={
+        'from_address': 'genesis',
+        'to_address': address,
+        'amount': 100.0,
+        'transaction_type': 'transfer',
+        'gas_limit': 21000,
+        'gas_price': 1.0,
+        'nonce': nonce
+    })
+    assert response.status_code == 200, response.text
+    return response.json()['data']['transaction_hash']
+
+@pytest.mark.parametrize('port', PORTS)
+def test_pending(port, tx_hash):
+    """The transaction shows up in this node's pending pool"""
+    deadline = time.monotonic() + PROPAGATION_TIMEOUT
+    delay = 0.05
+    while True:
+        status, body = fast_get(port, PENDING_PATH)
+        assert status == 200
+        pending_txs = orjson.loads(body)['data']['transactions']
+        if tx_hash in {tx['hash'] for tx in pending_txs}:
+            return
+        assert time.monotonic() < deadline, f"{tx_hash[:16]}... not pending on port {port}"
+        time.sleep(delay)
+        delay = min(delay * 1.5, 0.5)
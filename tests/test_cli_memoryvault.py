@@ -7,6 +7,9 @@ Demonstrates the new interactive MemoryVault wallet generation
 import subprocess
 import sys
 import time
+import orjson
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
 
 def test_cli_memoryvault():
     """Test the CLI MemoryVault functionality"""
@@ -37,7 +40,9 @@ def test_cli_memoryvault():
     print("2. Checking API status...")
     try:
         import requests
-        response = requests.get('http://localhost:5000/api/health', timeout=5)
+        # One keep-alive connection for the remaining API calls
+        session = requests.Session()
+        response = session.get('http://localhost:5000/api/health', timeout=5)
         if response.status_code == 200:
             print("✅ API is running")
         else:
@@ -62,11 +67,10 @@ def test_cli_memoryvault():
     """
     
     try:
-        import requests
-        response = requests.post('http://localhost:5000/api/memoryvault/validate-story', 
-                               json={'story': test_story})
+        response = session.post('http://localhost:5000/api/memoryvault/validate-story', 
+                               data=orjson.dumps({'story': test_story}), headers=JSON_HEADERS)
         if response.status_code == 200:
-            data = response.json()['data']
+            data = orjson.loads(response.content)['data']
             print(f"✅ Story validation works")
             print(f"   Personalness Score: {data['personalness_score']:.2f}")
             print(f"   Personal Elements: {data['personal_elements_count']}")
@@ -80,11 +84,10 @@ def test_cli_memoryvault():
     # Test 4: Test funded wallet creation
     print("4. Testing funded wallet creation...")
     try:
-        import requests
-        response = requests.post('http://localhost:5000/api/memoryvault/create-funded-wallet', 
-                               json={'story': test_story, 'funding_amount': 50.0})
+        response = session.post('http://localhost:5000/api/memoryvault/create-funded-wallet', 
+                               data=orjson.dumps({'story': test_story, 'funding_amount': 50.0}), headers=JSON_HEADERS)
         if response.status_code == 200:
-            data = response.json()['data']
+            data = orjson.loads(response.content)['data']
             print(f"✅ Funded wallet creation works")
             print(f"   Address: {data['address']}")
             print(f"   Mnemonic: {data['mnemonic'][:50]}...")
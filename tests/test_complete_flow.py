@@ -6,24 +6,34 @@ Demonstrates faucet, transactions, validators, and mining
 
 import requests
 import time
-import json
+import orjson
+from requests.adapters import HTTPAdapter
 
 API_URL = 'http://localhost:5000'
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# One keep-alive connection pool for every call to the node
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
 
 def make_request(method, endpoint, data=None):
     """Make HTTP request to API"""
     url = f"{API_URL}{endpoint}"
     try:
         if method.upper() == 'GET':
-            response = requests.get(url)
+            response = SESSION.get(url)
         elif method.upper() == 'POST':
-            response = requests.post(url, json=data)
+            # Bodies are pre-encoded with orjson rather than requests' stdlib json
+            if data is None:
+                response = SESSION.post(url)
+            else:
+                response = SESSION.post(url, data=orjson.dumps(data), headers=JSON_HEADERS)
         else:
             raise ValueError(f"Unsupported method: {method}")
         
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return orjson.loads(response.content)
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         print(f"Error making request: {e}")
         return {'status': 'error', 'message': str(e)}
 
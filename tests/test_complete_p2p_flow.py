@@ -4,255 +4,178 @@ Complete P2P Flow Test
 Tests the entire P2P flow: transaction submission, propagation, mining, and block propagation
 """
 
-import requests
+import asyncio
 import time
-import json
+import aiohttp
+import orjson
 from address import generate_address
 
-def test_complete_p2p_flow():
-    """Test the complete P2P flow"""
+NODE_URLS = ("http://localhost:5000", "http://localhost:5001", "http://localhost:5002")
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+async def fetch(session, method, url, payload=None):
+    """Send one request and decode the body with orjson; payloads are pre-encoded the same way"""
+    if payload is None:
+        request = session.request(method, url)
+    else:
+        request = session.request(method, url, data=orjson.dumps(payload), headers=JSON_HEADERS)
+    async with request as response:
+        return orjson.loads(await response.read())
+
+async def fetch_all(session, method, path):
+    """Send the same request to every node at once; results come back in NODE_URLS order"""
+    return await asyncio.gather(*(fetch(session, method, f"{url}{path}") for url in NODE_URLS))
+
+# Handle different response formats
+def get_chain_length(status):
+    if 'data' in status and 'chain_length' in status['data']:
+        return status['data']['chain_length']
+    elif 'chain_length' in status:
+        return status['chain_length']
+    else:
+        return 0
+
+def get_transactions(pending):
+    if 'data' in pending and 'transactions' in pending['data']:
+        return pending['data']['transactions']
+    elif 'transactions' in pending:
+        return pending['transactions']
+    else:
+        return []
+
+def get_pending_count(pending):
+    if 'data' in pending and 'count' in pending['data']:
+        return pending['data']['count']
+    elif 'count' in pending:
+        return pending['count']
+    else:
+        return len(get_transactions(pending))
+
+async def complete_p2p_flow(session):
+    """Run the P2P flow against the three nodes, querying them concurrently at each step"""
     print("🔍 Complete P2P Flow Test")
     print("=" * 50)
-    
-    # Test parameters
-    node1_url = "http://localhost:5000"
-    node2_url = "http://localhost:5001"
-    node3_url = "http://localhost:5002"
-    
+
+    node1_url, node2_url, node3_url = NODE_URLS
+
     print("📋 Instructions:")
     print("1. Make sure your 3 nodes are running on ports 5000, 5001, 5002")
     print("2. Watch the node terminals for P2P logs")
     print("3. This test will submit transactions and mine blocks")
-    
+
     # Step 1: Check node health
     print("\n1️⃣ Checking node health...")
     try:
-        health1 = requests.get(f"{node1_url}/api/health").json()
-        health2 = requests.get(f"{node2_url}/api/health").json()
-        health3 = requests.get(f"{node3_url}/api/health").json()
+        await fetch_all(session, 'GET', '/api/health')
         print("   ✅ All nodes are healthy")
     except Exception as e:
         print(f"   ❌ Node health check failed: {e}")
         return
-    
+
     # Step 2: Check initial state
     print("\n2️⃣ Checking initial state...")
     try:
         # Check chain lengths
-        status1 = requests.get(f"{node1_url}/api/status").json()
-        status2 = requests.get(f"{node2_url}/api/status").json()
-        status3 = requests.get(f"{node3_url}/api/status").json()
-        
-        # Handle different response formats
-        def get_chain_length(status):
-            if 'data' in status and 'chain_length' in status['data']:
-                return status['data']['chain_length']
-            elif 'chain_length' in status:
-                return status['chain_length']
-            else:
-                return 0
-        
-        def get_pending_count(pending):
-            if 'data' in pending and 'count' in pending['data']:
-                return pending['data']['count']
-            elif 'count' in pending:
-                return pending['count']
-            else:
-                return len(pending.get('transactions', []))
-        
-        chain1 = get_chain_length(status1)
-        chain2 = get_chain_length(status2)
-        chain3 = get_chain_length(status3)
-        
-        print(f"   Node 1 chain length: {chain1}")
-        print(f"   Node 2 chain length: {chain2}")
-        print(f"   Node 3 chain length: {chain3}")
-        
+        statuses = await fetch_all(session, 'GET', '/api/status')
+        for i, status in enumerate(statuses, 1):
+            print(f"   Node {i} chain length: {get_chain_length(status)}")
+
         # Check pending transactions
-        pending1 = requests.get(f"{node1_url}/api/transactions/pending").json()
-        pending2 = requests.get(f"{node2_url}/api/transactions/pending").json()
-        pending3 = requests.get(f"{node3_url}/api/transactions/pending").json()
-        
-        pending1_count = get_pending_count(pending1)
-        pending2_count = get_pending_count(pending2)
-        pending3_count = get_pending_count(pending3)
-        
-        print(f"   Node 1 pending: {pending1_count}")
-        print(f"   Node 2 pending: {pending2_count}")
-        print(f"   Node 3 pending: {pending3_count}")
-        
+        pendings = await fetch_all(session, 'GET', '/api/transactions/pending')
+        for i, pending in enumerate(pendings, 1):
+            print(f"   Node {i} pending: {get_pending_count(pending)}")
+
     except Exception as e:
         print(f"   ❌ Status check failed: {e}")
-        print(f"   Debug - Node 1 status: {requests.get(f'{node1_url}/api/status').text}")
+        async with session.get(f'{node1_url}/api/status') as response:
+            print(f"   Debug - Node 1 status: {await response.text()}")
         return
-    
+
     # Step 3: Generate test addresses
     print("\n3️⃣ Generating test addresses...")
     try:
-        address1 = requests.post(f"{node1_url}/api/utils/generate-address").json()['data']['address']
-        address2 = requests.post(f"{node2_url}/api/utils/generate-address").json()['data']['address']
-        address3 = requests.post(f"{node3_url}/api/utils/generate-address").json()['data']['address']
-        
-        print(f"   Address 1: {address1}")
-        print(f"   Address 2: {address2}")
-        print(f"   Address 3: {address3}")
+        address_resps = await fetch_all(session, 'POST', '/api/utils/generate-address')
+        addresses = [resp['data']['address'] for resp in address_resps]
+
+        for i, address in enumerate(addresses, 1):
+            print(f"   Address {i}: {address}")
     except Exception as e:
         print(f"   ❌ Address generation failed: {e}")
         return
-    
-    # Step 4: Submit transactions from all nodes
-    print("\n4️⃣ Submitting transactions from all nodes...")
+
+    # Step 4: Submit all transactions in one batch
+    print("\n4️⃣ Submitting transactions in one batch...")
     print("   ⚠️  WATCH YOUR NODE TERMINALS FOR P2P LOGS!")
-    
+
     transactions = []
-    
-    # Submit from Node 1
-    try:
-        nonce_resp = requests.get(f"{node1_url}/api/accounts/genesis/nonce").json()
-        current_nonce = nonce_resp['data']['nonce']
-        
-        tx_data = {
-            "from_address": "genesis",
-            "to_address": address1,
-            "amount": 50.0,
-            "transaction_type": "transfer",
-            "gas_limit": 21000,
-            "gas_price": 1.0,
-            "nonce": current_nonce
-        }
-        
-        tx_resp = requests.post(f"{node1_url}/api/transactions", json=tx_data).json()
-        
-        if tx_resp['status'] == 'success':
-            print(f"   ✅ Node 1 transaction: {tx_resp['data']['transaction_hash']}")
-            transactions.append(tx_resp['data']['transaction_hash'])
-        else:
-            print(f"   ❌ Node 1 transaction failed: {tx_resp}")
-    except Exception as e:
-        print(f"   ❌ Node 1 transaction failed: {e}")
-    
-    # Wait a moment
-    time.sleep(1)
-    
-    # Submit from Node 2
-    try:
-        nonce_resp = requests.get(f"{node2_url}/api/accounts/genesis/nonce").json()
-        current_nonce = nonce_resp['data']['nonce']
-        
-        tx_data = {
-            "from_address": "genesis",
-            "to_address": address2,
-            "amount": 40.0,
-            "transaction_type": "transfer",
-            "gas_limit": 21000,
-            "gas_price": 1.0,
-            "nonce": current_nonce
-        }
-        
-        tx_resp = requests.post(f"{node2_url}/api/transactions", json=tx_data).json()
-        
-        if tx_resp['status'] == 'success':
-            print(f"   ✅ Node 2 transaction: {tx_resp['data']['transaction_hash']}")
-            transactions.append(tx_resp['data']['transaction_hash'])
-        else:
-            print(f"   ❌ Node 2 transaction failed: {tx_resp}")
-    except Exception as e:
-        print(f"   ❌ Node 2 transaction failed: {e}")
-    
-    # Wait a moment
-    time.sleep(1)
-    
-    # Submit from Node 3
+
     try:
-        nonce_resp = requests.get(f"{node3_url}/api/accounts/genesis/nonce").json()
+        # Nonces are assigned here from a single lookup, so the batch needs no further round-trips
+        nonce_resp = await fetch(session, 'GET', f"{node1_url}/api/accounts/genesis/nonce")
         current_nonce = nonce_resp['data']['nonce']
-        
-        tx_data = {
-            "from_address": "genesis",
-            "to_address": address3,
-            "amount": 30.0,
-            "transaction_type": "transfer",
-            "gas_limit": 21000,
-            "gas_price": 1.0,
-            "nonce": current_nonce
-        }
-        
-        tx_resp = requests.post(f"{node3_url}/api/transactions", json=tx_data).json()
-        
-        if tx_resp['status'] == 'success':
-            print(f"   ✅ Node 3 transaction: {tx_resp['data']['transaction_hash']}")
-            transactions.append(tx_resp['data']['transaction_hash'])
+
+        tx_list = [
+            {
+                "from_address": "genesis",
+                "to_address": address,
+                "amount": amount,
+                "transaction_type": "transfer",
+                "gas_limit": 21000,
+                "gas_price": 1.0,
+                "nonce": current_nonce + i
+            }
+            for i, (address, amount) in enumerate(zip(addresses, (50.0, 40.0, 30.0)))
+        ]
+
+        batch_resp = await fetch(session, 'POST', f"{node1_url}/api/transactions/batch", {'transactions': tx_list})
+
+        if batch_resp['status'] == 'success':
+            for i, result in enumerate(batch_resp['data']['results'], 1):
+                if result['status'] == 'success':
+                    print(f"   ✅ Transaction {i}: {result['transaction_hash']}")
+                    transactions.append(result['transaction_hash'])
+                else:
+                    print(f"   ❌ Transaction {i} failed: {result['message']}")
         else:
-            print(f"   ❌ Node 3 transaction failed: {tx_resp}")
+            print(f"   ❌ Batch submission failed: {batch_resp}")
     except Exception as e:
-        print(f"   ❌ Node 3 transaction failed: {e}")
-    
+        print(f"   ❌ Batch submission failed: {e}")
+
     # Step 5: Wait for propagation
     print("\n5️⃣ Waiting for transaction propagation...")
-    time.sleep(3)
-    
+    await asyncio.sleep(3)
+
     # Step 6: Check transaction propagation
     print("\n6️⃣ Checking transaction propagation...")
     try:
-        pending1 = requests.get(f"{node1_url}/api/transactions/pending").json()
-        pending2 = requests.get(f"{node2_url}/api/transactions/pending").json()
-        pending3 = requests.get(f"{node3_url}/api/transactions/pending").json()
-        
-        # Helper function to get transactions list
-        def get_transactions(pending):
-            if 'data' in pending and 'transactions' in pending['data']:
-                return pending['data']['transactions']
-            elif 'transactions' in pending:
-                return pending['transactions']
-            else:
-                return []
-        
-        def get_pending_count(pending):
-            if 'data' in pending and 'count' in pending['data']:
-                return pending['data']['count']
-            elif 'count' in pending:
-                return pending['count']
-            else:
-                return len(get_transactions(pending))
-        
-        pending1_count = get_pending_count(pending1)
-        pending2_count = get_pending_count(pending2)
-        pending3_count = get_pending_count(pending3)
-        
-        print(f"   Node 1 pending: {pending1_count}")
-        print(f"   Node 2 pending: {pending2_count}")
-        print(f"   Node 3 pending: {pending3_count}")
-        
+        pendings = await fetch_all(session, 'GET', '/api/transactions/pending')
+
+        for i, pending in enumerate(pendings, 1):
+            print(f"   Node {i} pending: {get_pending_count(pending)}")
+
         # Check if all transactions propagated
+        pending_hashes = [{tx['hash'] for tx in get_transactions(pending)} for pending in pendings]
         all_propagated = True
         for tx_hash in transactions:
-            tx_list1 = get_transactions(pending1)
-            tx_list2 = get_transactions(pending2)
-            tx_list3 = get_transactions(pending3)
-            
-            tx_in_node1 = any(tx['hash'] == tx_hash for tx in tx_list1)
-            tx_in_node2 = any(tx['hash'] == tx_hash for tx in tx_list2)
-            tx_in_node3 = any(tx['hash'] == tx_hash for tx in tx_list3)
-            
-            if not (tx_in_node1 and tx_in_node2 and tx_in_node3):
+            if not all(tx_hash in hashes for hashes in pending_hashes):
                 all_propagated = False
                 print(f"   ❌ Transaction {tx_hash[:8]}... did not propagate to all nodes")
-        
+
         if all_propagated:
             print("   ✅ All transactions successfully propagated!")
         else:
             print("   ❌ Some transactions did not propagate")
-            
+
     except Exception as e:
         print(f"   ❌ Propagation check failed: {e}")
-    
+
     # Step 7: Mine a block (should trigger block propagation)
     print("\n7️⃣ Mining a block (should trigger block propagation)...")
     print("   ⚠️  WATCH YOUR NODE TERMINALS FOR BLOCK PROPAGATION LOGS!")
-    
+
     try:
-        mine_resp = requests.post(f"{node1_url}/api/mining/mine").json()
-        
+        mine_resp = await fetch(session, 'POST', f"{node1_url}/api/mining/mine")
+
         if mine_resp['status'] == 'success':
             print(f"   ✅ Block mined: {mine_resp['data']['message']}")
             print(f"   📦 Block hash: {mine_resp['data']['block_hash']}")
@@ -261,70 +184,42 @@ def test_complete_p2p_flow():
             print(f"   ❌ Mining failed: {mine_resp}")
     except Exception as e:
         print(f"   ❌ Mining failed: {e}")
-    
+
     # Step 8: Wait for block propagation
     print("\n8️⃣ Waiting for block propagation...")
-    time.sleep(3)
-    
+    await asyncio.sleep(3)
+
     # Step 9: Check block propagation
     print("\n9️⃣ Checking block propagation...")
     try:
-        status1 = requests.get(f"{node1_url}/api/status").json()
-        status2 = requests.get(f"{node2_url}/api/status").json()
-        status3 = requests.get(f"{node3_url}/api/status").json()
-        
-        # Helper function to get chain length
-        def get_chain_length(status):
-            if 'data' in status and 'chain_length' in status['data']:
-                return status['data']['chain_length']
-            elif 'chain_length' in status:
-                return status['chain_length']
-            else:
-                return 0
-        
-        def get_pending_count(pending):
-            if 'data' in pending and 'count' in pending['data']:
-                return pending['data']['count']
-            elif 'count' in pending:
-                return pending['count']
-            else:
-                return len(pending.get('transactions', []))
-        
-        chain1 = get_chain_length(status1)
-        chain2 = get_chain_length(status2)
-        chain3 = get_chain_length(status3)
-        
-        print(f"   Node 1 chain length: {chain1}")
-        print(f"   Node 2 chain length: {chain2}")
-        print(f"   Node 3 chain length: {chain3}")
-        
+        statuses, pendings = await asyncio.gather(
+            fetch_all(session, 'GET', '/api/status'),
+            fetch_all(session, 'GET', '/api/transactions/pending')
+        )
+
+        chain_lengths = [get_chain_length(status) for status in statuses]
+        for i, chain_length in enumerate(chain_lengths, 1):
+            print(f"   Node {i} chain length: {chain_length}")
+
         # Check if chains are synchronized
-        if chain1 == chain2 == chain3:
+        if len(set(chain_lengths)) == 1:
             print("   ✅ All nodes have synchronized chains!")
         else:
             print("   ❌ Chains are not synchronized")
-        
+
         # Check pending transactions (should be 0 after mining)
-        pending1 = requests.get(f"{node1_url}/api/transactions/pending").json()
-        pending2 = requests.get(f"{node2_url}/api/transactions/pending").json()
-        pending3 = requests.get(f"{node3_url}/api/transactions/pending").json()
-        
-        pending1_count = get_pending_count(pending1)
-        pending2_count = get_pending_count(pending2)
-        pending3_count = get_pending_count(pending3)
-        
-        print(f"   Node 1 pending: {pending1_count}")
-        print(f"   Node 2 pending: {pending2_count}")
-        print(f"   Node 3 pending: {pending3_count}")
-        
-        if pending1_count == pending2_count == pending3_count == 0:
+        pending_counts = [get_pending_count(pending) for pending in pendings]
+        for i, pending_count in enumerate(pending_counts, 1):
+            print(f"   Node {i} pending: {pending_count}")
+
+        if not any(pending_counts):
             print("   ✅ All pending transactions cleared after mining!")
         else:
             print("   ❌ Pending transactions not cleared")
-            
+
     except Exception as e:
         print(f"   ❌ Block propagation check failed: {e}")
-    
+
     print("\n📝 What to look for in your node terminals:")
     print("✅ [P2P] Broadcasting transaction message to X peers")
     print("✅ [P2P] Received message: {\"type\": \"transaction\"...}")
@@ -332,9 +227,18 @@ def test_complete_p2p_flow():
     print("✅ [P2P] Broadcasting block message to X peers")
     print("✅ [P2P] Received message: {\"type\": \"block\"...}")
     print("✅ [P2P] Adding received block [index]")
-    
+
     print("\n🎉 Complete P2P flow test finished!")
     print("🚀 Your Lakha blockchain now has full P2P functionality!")
 
+async def run_complete_p2p_flow():
+    # One session, and so one connection pool, for the whole flow
+    async with aiohttp.ClientSession() as session:
+        await complete_p2p_flow(session)
+
+def test_complete_p2p_flow():
+    """Test the complete P2P flow"""
+    asyncio.run(run_complete_p2p_flow())
+
 if __name__ == "__main__":
-    test_complete_p2p_flow() 
\ No newline at end of file
+    test_complete_p2p_flow()
@@ -48,6 +48,16 @@ def test_ledger_basic():
     history = ledger.get_account_history(alice)
     assert len(history) == 2  # Debit and gas cost entries
     
+    # Unknown addresses have no history and aren't added to the index
+    assert ledger.get_account_history(charlie) == []
+    assert charlie not in ledger.account_history
+    
+    # Batched lookup returns each address's history, including empty ones
+    histories = ledger.get_accounts_history([alice, bob, charlie], limit=1)
+    assert histories[alice] == history[-1:]
+    assert len(histories[bob]) == 1
+    assert histories[charlie] == []
+    
     # Test total supply
     total_supply = ledger.get_total_supply()
     assert total_supply == 99.0  # 49 + 50
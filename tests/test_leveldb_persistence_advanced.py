@@ -194,4 +194,23 @@ def test_edge_cases_empty_and_failed_blocks(tmp_path):
     # Try to mine block with only failed tx
     mined = blockchain.mine_block()
     # Block may be added, but tx will not change state
-    blockchain.close() 
\ No newline at end of file
+    blockchain.close() 
+# Blocks whose transaction data orjson cannot encode on its own
+def test_block_with_wide_int_and_int_key_data(tmp_path):
+    db_path = str(tmp_path / "db")
+    blockchain = LahkaBlockchain(db_path=db_path)
+    data = {'big': 2**70, 'by_id': {7: 'x'}, 'limit': float('inf')}
+    tx = Transaction('genesis', generate_address(), 1, TransactionType.TRANSFER, data=data, gas_limit=1)
+    assert blockchain.add_transaction(tx)
+    assert blockchain.mine_block()
+    block = blockchain.chain[-1]
+    assert [t.hash for t in block.transactions] == [tx.hash]
+    # The listing encoding matches the stdlib one, Infinity included, and the block reached LevelDB
+    assert block.to_json() == json.dumps(block.to_dict(), separators=(',', ':')).encode()
+    assert blockchain.storage.get_block(block.index)['hash'] == block.hash
+    blockchain.close()
+    # Restart
+    blockchain2 = LahkaBlockchain(db_path=db_path)
+    assert len(blockchain2.chain) == 2
+    assert blockchain2.chain[-1].transactions[0].data['big'] == 2**70
+    blockchain2.close()
@@ -0,0 +1,36 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from core import LahkaBlockchain, Transaction, TransactionType
+from address import generate_address
+
+@pytest.fixture
+def blockchain(tmp_path):
+    blockchain = LahkaBlockchain(db_path=str(tmp_path / "db"))
+    yield blockchain
+    blockchain.close()
+
+def test_mine_blocks_drains_pool(blockchain):
+    """mine_blocks keeps producing blocks until the pool is empty or n is reached"""
+    nonce = blockchain.ledger.get_account('genesis').nonce
+    recipient = generate_address()
+    txs = [
+        Transaction(
+            from_address='genesis',
+            to_address=recipient,
+            amount=1.0,
+            transaction_type=TransactionType.TRANSFER,
+            nonce=nonce + i
+        )
+        for i in range(150)
+    ]
+    assert all(blockchain.add_transactions(txs))
+    start_length = len(blockchain.chain)
+
+    # 100 transactions fit in a block, so the pool empties after two
+    assert blockchain.mine_blocks(5) == 2
+    assert len(blockchain.chain) == start_length + 2
+    assert [len(block.transactions) for block in blockchain.chain[-2:]] == [100, 50]
+    assert not blockchain.pending_transactions
+    assert blockchain.mine_blocks(5) == 0
@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+import math
+import orjson
+import pytest
+from core import Block, Transaction, TransactionType, encode_json
+from address import generate_address
+
+def test_dataclass_encoding_matches_to_dict():
+    """orjson's native dataclass encoding is used in place of to_dict(), so the two must agree"""
+    tx = Transaction(
+        from_address='genesis',
+        to_address=generate_address(),
+        amount=5.0,
+        transaction_type=TransactionType.STAKE,
+        data={'memo': 'hi'},
+        nonce=3,
+        signature='sig'
+    )
+    assert orjson.dumps(tx) == orjson.dumps(tx.to_dict())
+
+    block = Block(index=1, timestamp=1.0, transactions=[tx], previous_hash='0', validator='genesis')
+    assert block.to_json() == orjson.dumps(block.to_dict())
+
+@pytest.mark.parametrize('data', [
+    {'big': 2**70},
+    {'by_id': {7: 'x'}},
+    {'limit': float('inf'), 'floor': float('-inf')},
+    {'ratio': math.nan},
+])
+def test_encode_json_matches_stdlib_where_orjson_differs(data):
+    """Values orjson rejects or rewrites are encoded as the stdlib to_dict() path did"""
+    tx = Transaction(
+        from_address='genesis',
+        to_address=generate_address(),
+        amount=5.0,
+        transaction_type=TransactionType.TRANSFER,
+        data=data
+    )
+    expected = json.dumps(tx.to_dict(), separators=(',', ':')).encode()
+    assert encode_json(tx) == expected
+    assert encode_json({'transactions': [tx]}) == b'{"transactions":[' + expected + b']}'
@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from core import LahkaBlockchain, Transaction, TransactionType
+from address import generate_address
+from rpc_node import server
+
+@pytest.fixture
+def blockchain(tmp_path):
+    blockchain = LahkaBlockchain(db_path=str(tmp_path / "db"))
+    yield blockchain
+    blockchain.close()
+
+def test_transactions_page_matches_flattened_chain(blockchain):
+    """Paging confirmed transactions returns the same window as flattening the chain"""
+    for _ in range(4):
+        nonce = blockchain.ledger.get_account('genesis').nonce
+        blockchain.add_transaction(Transaction(
+            from_address='genesis',
+            to_address=generate_address(),
+            amount=1.0,
+            transaction_type=TransactionType.TRANSFER,
+            nonce=nonce
+        ))
+        assert blockchain.mine_block()
+
+    flattened = [tx for block in blockchain.chain for tx in block.transactions]
+    assert blockchain.get_transaction_count() == len(flattened)
+    for start, end in [(0, 2), (1, 3), (2, 100), (len(flattened), len(flattened) + 5)]:
+        page = blockchain.get_transactions_page(start, end)
+        assert [tx.hash for tx in page] == [tx.hash for tx in flattened[start:end]]
+
+def test_pending_transactions_middle_page(tmp_path):
+    """A page of the pending pool is the matching slice; count covers the page, total the pool"""
+    client = server.create_app(str(tmp_path / "rpc_db"), None, None, 'authority').test_client()
+    try:
+        nonce = server.blockchain.ledger.get_account('genesis').nonce
+        txs = [
+            Transaction(
+                from_address='genesis',
+                to_address=generate_address(),
+                amount=1.0,
+                transaction_type=TransactionType.TRANSFER,
+                nonce=nonce + i
+            )
+            for i in range(5)
+        ]
+        assert all(server.blockchain.add_transactions(txs))
+
+        data = client.get('/api/transactions/pending?page=2&limit=2').get_json()['data']
+        assert [tx['hash'] for tx in data['transactions']] == [tx.hash for tx in txs[2:4]]
+        assert data['count'] == 2
+        assert data['total'] == 5
+
+        # Without page/limit the whole pool comes back
+        data = client.get('/api/transactions/pending').get_json()['data']
+        assert data['count'] == data['total'] == 5
+    finally:
+        server.blockchain.close()